@@ -0,0 +1,71 @@
+# Python imports
+from time import monotonic
+from traceback import print_exc
+from typing import Callable, Dict, List
+
+# RPG imports
+from .player import Player
+
+
+class XPAccumulator:
+    """Buffer for XP awards, given to the players in bulk.
+
+    Awards made with `add()` are summed per player, and `run()`
+    gives each player their sum with a single `Player.give_xp()` call,
+    so a burst of awards within the same tick levels the player up
+    only once and notifies `OnPlayerLevelUp` only once.
+
+    The `run()` method should be called on every tick, and it flushes
+    the awards at most once per `interval` seconds, or on every tick
+    if the interval is zero.
+    """
+
+    def __init__(self, interval: float=0.0, clock: Callable[[], float]=monotonic) -> None:
+        self.interval = interval
+        self.clock = clock
+        self._pending: Dict[int, List] = {}  # index: [player, amount]
+        self._next_flush = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, player: Player, amount: int) -> None:
+        """Buffer an amount of XP for the player."""
+        if amount < 0:
+            raise ValueError(f"Negative amount '{amount}' passed for XPAccumulator.add()")
+        if not amount:
+            return
+        entry = self._pending.get(player.index)
+        if entry is None or entry[0] is not player:
+            if entry is not None:
+                self.flush_player(entry[0])
+            self._pending[player.index] = [player, amount]
+        else:
+            entry[1] += amount
+
+    def run(self) -> None:
+        """Flush the buffered XP if the interval has passed."""
+        if not self._pending:
+            return
+        if self.interval > 0:
+            now = self.clock()
+            if now < self._next_flush:
+                return
+            self._next_flush = now + self.interval
+        self.flush()
+
+    def flush(self) -> None:
+        """Give every player their buffered XP."""
+        pending, self._pending = self._pending, {}
+        for player, amount in pending.values():
+            try:
+                player.give_xp(amount)
+            except Exception:
+                print_exc()
+
+    def flush_player(self, player: Player) -> None:
+        """Give a player their buffered XP right away, like before they leave."""
+        entry = self._pending.get(player.index)
+        if entry is not None and entry[0] is player:
+            del self._pending[player.index]
+            player.give_xp(entry[1])
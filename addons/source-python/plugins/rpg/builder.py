@@ -1,33 +1,56 @@
 # Python imports
+import json
+import os
+import sys
 from collections import OrderedDict
-from inspect import getmembers
+from collections.abc import Mapping
+from inspect import getmembers, isclass
 from importlib import import_module
-from typing import Dict
+from importlib import reload as reload_module
+from math import inf
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Site-Package imports
 import yaml
 
 # Source.Python imports
 from path import Path
-from translations.strings import LangStrings
+from translations.strings import LangStrings, TranslationStrings
 
 # RPG imports
 import rpg.skills
-from .skill import SkillType
+from .skill import EventCallback, SkillType
 
 
-def build_skill_types(root: Path) -> Dict[str, SkillType]:
+def build_skill_types(root: Path, cache_path: Optional[Path]=None) -> Dict[str, SkillType]:
     """Build skill type objects from a directory of skills.
     
     Attempt to order the skills by `order.txt` file's content.
+
+    If a `cache_path` is given, the compiled skills are cached
+    into a manifest file, and skills whose files haven't changed
+    are built from it without parsing any of their files.
     """
+    manifest = _read_manifest(cache_path) if cache_path is not None else {}
+    entries = {}
     skill_types = OrderedDict()
     for path in root.dirs():
-        skill = build_skill(path)
+        stamp = _stamp(path)
+        entry = manifest.get(path.name)
+        if entry is not None and entry['stamp'] == stamp:
+            skill = _skill_from_manifest(path, entry)
+        else:
+            skill = build_skill(path)
+            if skill is not None:
+                entry = _manifest_entry(skill, stamp)
         if skill is None:
             print(f"Unable to build skill for path '{path}'")
         else:
             skill_types[skill.key] = skill
+            entries[path.name] = entry
+
+    if cache_path is not None and entries != manifest:
+        _write_manifest(cache_path, entries)
 
     try:
         with open(root / 'order.txt') as order_file:
@@ -45,33 +68,213 @@ def build_skill_types(root: Path) -> Dict[str, SkillType]:
     return ordered
 
 
-def build_skill(path: Path) -> SkillType:
+def build_skill(path: Path, *, reload: bool=False) -> SkillType:
     """Build a skill from a directory.
     
     The directory must have `data.yml`, `events.py`,
     and `strings.ini` files in it.
     See `skills/README.md` for more information.
+
+    Use `reload` to re-execute an already imported `events.py`.
     """
     key = str(path.name)  # Remove "pathiness"
     with open(path / 'data.yml') as data_file:
         data = yaml.safe_load(data_file)
     if 'key' in data:
         key = data.pop('key')
+    if 'values' in data:
+        data['values'] = _evaluate_values(data['values'], data.get('max_level', inf))
     strings = LangStrings(path / 'strings')
+    init_callback, event_callbacks = _import_events(path, reload=reload)
 
+    return SkillType(
+        key,
+        lang_strings=strings,
+        init_callback=init_callback,
+        event_callbacks=event_callbacks,
+        path=path,
+        **data,
+    )
+
+
+def _evaluate_values(formulas: Dict[str, Any], max_level: int) -> Dict[str, List[Any]]:
+    """Evaluate a skill's per-level value formulas into tables.
+
+    Each formula is either a constant, a list of values per level
+    (repeating the last value for the remaining levels), or a dict of
+    `base` and `per_level`, which are evaluated as `base + per_level * level`.
+    The tables have a value for every level from zero to `max_level`.
+    """
+    if not formulas:
+        return {}
+    if max_level == inf:
+        raise ValueError("Skill values require a finite 'max_level'")
+    levels = range(max_level + 1)
+    tables = {}
+    for name, formula in formulas.items():
+        if isinstance(formula, list):
+            if not formula:
+                raise ValueError(f"Empty list of values for '{name}'")
+            tables[name] = [formula[min(level, len(formula) - 1)] for level in levels]
+        elif isinstance(formula, dict):
+            base, per_level = formula.get('base', 0), formula.get('per_level', 0)
+            tables[name] = [base + per_level * level for level in levels]
+        else:
+            tables[name] = [formula] * len(levels)
+    return tables
+
+
+def _import_events(
+    path: Path,
+    *,
+    reload: bool=False,
+) -> Tuple[Optional[EventCallback], Dict[str, EventCallback]]:
+    """Import a skill's `events.py` and collect its callbacks."""
     init_callback = None
     event_callbacks = {}
-    events_module = import_module(f'rpg.skills.{path.name}.events', rpg.skills)
+    module_name = f'rpg.skills.{path.name}.events'
+    if reload and module_name in sys.modules:
+        events_module = reload_module(sys.modules[module_name])
+    else:
+        events_module = import_module(module_name, rpg.skills)
     for name, attr in getmembers(events_module):
+        if name.startswith('_') or not callable(attr) or isclass(attr):
+            continue
         if name == 'init':
             init_callback = attr
-        elif not name.startswith('_'):
+        else:
             event_callbacks[name] = attr
+    return init_callback, event_callbacks
+
+
+# ========================
+#  Manifest cache
+# ========================
+
+_MANIFEST_VERSION = 2
+_STAMPED_FILES = ('data.yml', 'strings.ini', 'strings_server.ini', 'events.py')
+
+
+def _stamp(path: Path) -> List[Optional[List[int]]]:
+    """Get the modification times and sizes of a skill's files."""
+    stamp = []
+    for file_name in _STAMPED_FILES:
+        try:
+            stat = os.stat(path / file_name)
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append([stat.st_mtime_ns, stat.st_size])
+    return stamp
+
+
+def _manifest_entry(skill: SkillType, stamp: list) -> Dict[str, Any]:
+    """Compile a skill type into a JSON compatible manifest entry."""
+    return {
+        'stamp': stamp,
+        'key': skill.key,
+        'max_level': skill.max_level,
+        'variables': skill.variables,
+        'state': skill.state,
+        'values': skill.values,
+        'strings': {name: dict(strings) for name, strings in skill.lang_strings.items()},
+        'init': skill.init_callback is not None,
+        'events': sorted(skill.event_callbacks),
+    }
+
+
+def _skill_from_manifest(path: Path, entry: Dict[str, Any]) -> SkillType:
+    """Build a skill type from a manifest entry without parsing its files.
 
+    The skill's events module is only imported once
+    any of its callbacks are needed for the first time.
+    """
+    events = _LazyEvents(path)
     return SkillType(
-        key,
-        lang_strings=strings,
-        init_callback=init_callback,
-        event_callbacks=event_callbacks,
-        **data,
+        entry['key'],
+        lang_strings=_lang_strings_from_dict(entry['strings']),
+        max_level=entry['max_level'],
+        variables=entry['variables'],
+        state=entry['state'],
+        values=entry['values'],
+        init_callback=events.init if entry['init'] else None,
+        event_callbacks=_LazyEventCallbacks(entry['events'], events),
+        path=path,
     )
+
+
+def _lang_strings_from_dict(data: Dict[str, Dict[str, str]]) -> LangStrings:
+    """Create `LangStrings` from a dict without reading any files."""
+    lang_strings = LangStrings.__new__(LangStrings)
+    for name, translations in data.items():
+        strings = lang_strings[name] = TranslationStrings()
+        strings.update(translations)
+    return lang_strings
+
+
+class _LazyEvents:
+    """A skill's events module, imported on first use."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._callbacks = None
+
+    def load(self) -> Tuple[Optional[EventCallback], Dict[str, EventCallback]]:
+        if self._callbacks is None:
+            self._callbacks = _import_events(self.path)
+        return self._callbacks
+
+    def init(self, **kwargs: Any) -> None:
+        init_callback, _ = self.load()
+        init_callback(**kwargs)
+
+
+class _LazyEventCallbacks(Mapping):
+    """Read-only event callbacks mapping of a cached skill.
+
+    The event names are known from the manifest,
+    so checking and iterating them doesn't import the events module,
+    but accessing any of the callbacks does.
+    """
+
+    def __init__(self, event_names: Iterable[str], events: _LazyEvents) -> None:
+        self._event_names = frozenset(event_names)
+        self._events = events
+
+    def __contains__(self, event_name: object) -> bool:
+        return event_name in self._event_names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._event_names)
+
+    def __len__(self) -> int:
+        return len(self._event_names)
+
+    def __getitem__(self, event_name: str) -> EventCallback:
+        if event_name not in self._event_names:
+            raise KeyError(event_name)
+        _, event_callbacks = self._events.load()
+        return event_callbacks[event_name]
+
+
+def _read_manifest(cache_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read the manifest's entries, or nothing if it's missing or outdated."""
+    try:
+        with open(cache_path, encoding='utf-8') as cache_file:
+            manifest = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != _MANIFEST_VERSION:
+        return {}
+    return manifest.get('skills', {})
+
+
+def _write_manifest(cache_path: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    """Write the manifest atomically so a crash can't leave it half-written."""
+    temp_path = Path(f'{cache_path}.tmp')
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump({'version': _MANIFEST_VERSION, 'skills': entries}, cache_file)
+        os.replace(temp_path, cache_path)
+    except (OSError, TypeError, ValueError) as error:
+        print(f"Unable to write skill manifest '{cache_path}': {error}")
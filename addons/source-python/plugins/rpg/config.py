@@ -21,6 +21,90 @@ XP_GAIN = {
 }
 
 
+# How often (in seconds) XP from kills and damage is given to the players.
+# The XP is summed per player in between, 0 to give it on every tick.
+XP_FLUSH_INTERVAL = 0
+
+
+# Relative weights of skills for bots spending their credits, by skill key.
+# Skills not listed use the default weight, and zero weight disables a skill.
+BOT_SKILL_WEIGHTS = {
+    'health': 2,
+    'regeneration': 2,
+}
+BOT_DEFAULT_SKILL_WEIGHT = 1
+
+
+# How often (in seconds) changed players are queued for saving
+SAVE_INTERVAL = 240
+
+# How long (in seconds) to wait for queued saves when the plugin unloads
+SAVE_FLUSH_TIMEOUT = 10
+
+# How many times in a row a player's save can fail while others succeed
+# before their changes are parked instead of retried
+SAVE_MAX_ATTEMPTS = 3
+
+
+# Directory for the journal of progression changes between saves,
+# which is replayed into the database after a crash. None to disable.
+JOURNAL_PATH = PLUGIN_DATA_PATH / 'rpg_journal'
+
+# How often (in seconds) the journal is flushed to the disk, fsyncing it in the background
+JOURNAL_SYNC_INTERVAL = 1
+
+
+# Whether to load players's data on worker threads instead of the game thread
+ASYNC_PLAYER_LOADING = True
+
+# Amount of worker threads for loading players's data
+PLAYER_LOADER_WORKERS = 2
+
+# Seconds to wait before retrying a failed load, doubled after each failure up to the maximum
+PLAYER_LOAD_RETRY_DELAY = 1
+PLAYER_LOAD_MAX_RETRY_DELAY = 30
+
+# Maximum amount of recently disconnected players to keep in memory, 0 to disable
+SESSION_CACHE_SIZE = 256
+
+# Seconds to keep a disconnected player in memory for them to reconnect without loading,
+# unless their last save had to be merged with another server's changes
+SESSION_CACHE_TTL = 300
+
+# Maximum amount of skill events to buffer for a player while their data loads
+LOADING_BUFFER_SIZE = 64
+
+
+# How many of the highest ranked players to show in the leaderboard menu
+LEADERBOARD_SIZE = 50
+
+# How many players above and below the player to show in the rank menu
+LEADERBOARD_RANK_RADIUS = 3
+
+# How many players to read from the database at once when loading the leaderboard
+# in the background. The whole leaderboard is kept in memory, roughly 350 MB per million players
+LEADERBOARD_PAGE_SIZE = 1000
+
+
+# Cache file for the compiled skills, to speed up loading the plugin. None to disable.
+SKILL_CACHE_PATH = PLUGIN_DATA_PATH / 'rpg_skills.json'
+
+# Default file for recording game events with the `rpg_trace` command
+TRACE_PATH = PLUGIN_DATA_PATH / 'rpg_trace.jsonl.gz'
+
+
+# How many players to migrate per batch from the old database tables
+MIGRATION_BATCH_SIZE = 500
+
+# How long (in seconds) to pause between the migration's batches
+MIGRATION_BATCH_DELAY = 0.5
+
+# Most rows the old skill table can have for it to be indexed while the server runs,
+# since indexing locks the database. Bigger tables must be indexed offline before
+# they're migrated, with "python -m rpg.transfer index-legacy <database URL>"
+LEGACY_INDEX_MAX_ROWS = 100_000
+
+
 # Database URL in SQLAlchemy's format
 DATABASE_URL = {
     'drivername': 'sqlite',
@@ -31,3 +115,33 @@ DATABASE_URL = {
     'database': PLUGIN_DATA_PATH / 'rpg.db',
     'query': '',
 }
+
+
+# Connection pool and tuning options for the database engine
+DATABASE_OPTIONS = {
+    # Persistent connections kept open for the game and worker threads
+    'pool_size': 4,
+    'max_overflow': 4,
+    # Reconnect connections older than this (in seconds)
+    'pool_recycle': 3600,
+    # PRAGMAs executed on every new SQLite connection, ignored by other databases
+    'sqlite_pragmas': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,  # Negative values are in KiB
+    },
+}
+
+
+# Whether to record the latency of every database statement for the `rpg_db_stats` command
+DATABASE_QUERY_STATS = True
+
+# Statements slower than this (in seconds) are written into the slow query log
+DATABASE_SLOW_QUERY_THRESHOLD = 0.1
+
+# Slow query log file, rotated once it grows over the maximum size (in bytes)
+DATABASE_SLOW_QUERY_LOG = PLUGIN_DATA_PATH / 'rpg_slow_queries.log'
+DATABASE_SLOW_QUERY_LOG_SIZE = 1_000_000
+
+# How many rotated slow query logs to keep
+DATABASE_SLOW_QUERY_LOG_BACKUPS = 3
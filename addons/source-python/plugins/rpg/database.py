@@ -1,114 +1,721 @@
+# Python imports
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
 # Site-Package imports
-from sqlalchemy import create_engine, Column, ForeignKey, Integer, MetaData, Table, Text
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
-from sqlalchemy.sql import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql import and_, case, exists, func, null, select
 from sqlalchemy.sql.expression import bindparam
+from sqlalchemy.util import LRUCache
 
 # RPG imports
 from . import config
+from .journal import PlayerRecords, SkillRecords
+from .persistence import PlayerData, PlayerSnapshot, apply_player_data, take_snapshot
 from .player import Player
+from .querystats import QueryStats
+from .tables import (
+    create_missing_index, has_index, legacy_metadata, legacy_player_table, legacy_skill_index,
+    legacy_skill_table, metadata, migration_table, player_table, skill_key_table, skill_table, upgrade_schema,
+)
+from .utils import levels_to_xp, xp_to_levels
 
 
-# Initialize table metadata
-metadata = MetaData()
-player_table = Table('player', metadata,
-    Column('steamid', Text, primary_key=True),
-    Column('level', Integer, nullable=False, default=0),
-    Column('xp', Integer, nullable=False, default=0),
-    Column('credits', Integer, nullable=False, default=0),
-)
+# Maximum amount of compiled statements to cache,
+# enough for every prebuilt statement with room to spare
+_COMPILED_CACHE_SIZE = 100
+
+
+def _create_engine() -> Engine:
+    """Create the engine using the `DATABASE_URL` and `DATABASE_OPTIONS` configs.
+
+    File based SQLite databases get a pool of persistent connections
+    instead of reconnecting for every query, and the configured
+    PRAGMAs are executed on each new connection.
+    The returned engine caches the compiled forms of the most recently
+    executed statement objects, so statements built once at import time
+    are compiled only once.
+    """
+    url = URL(**config.DATABASE_URL)
+    options = dict(config.DATABASE_OPTIONS)
+    pragmas = options.pop('sqlite_pragmas', None)
+
+    is_sqlite = url.get_backend_name() == 'sqlite'
+    if is_sqlite and url.database not in (None, '', ':memory:'):
+        options.setdefault('poolclass', QueuePool)
+        # Connections are shared between the game and worker threads,
+        # but the pool never hands one connection to two threads at once
+        connect_args = dict(options.get('connect_args', {}))
+        connect_args.setdefault('check_same_thread', False)
+        options['connect_args'] = connect_args
+    elif is_sqlite:
+        for key in ('pool_size', 'max_overflow'):
+            options.pop(key, None)
+
+    engine = create_engine(url, **options)
+
+    if is_sqlite and pragmas:
+        @event.listens_for(engine, 'connect')
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+
+    return engine.execution_options(compiled_cache=LRUCache(_COMPILED_CACHE_SIZE))
 
-skill_table = Table('skill', metadata,
-    Column('id', Integer, primary_key=True),
-    Column('key', Text, nullable=False),
-    Column('level', Integer, nullable=False, default=0),
-    Column('steamid', Text, ForeignKey('player.steamid'), nullable=False),
-)
 
 # Create engine and missing tables
-engine = create_engine(URL(**config.DATABASE_URL))
+engine = _create_engine()
+query_stats = QueryStats(
+    slow_threshold=config.DATABASE_SLOW_QUERY_THRESHOLD,
+    slow_log=config.DATABASE_SLOW_QUERY_LOG,
+    slow_log_size=config.DATABASE_SLOW_QUERY_LOG_SIZE,
+    slow_log_backups=config.DATABASE_SLOW_QUERY_LOG_BACKUPS,
+)
+if config.DATABASE_QUERY_STATS:
+    query_stats.attach(engine)
 metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+
+# Hot statements, built once so that their compiled forms get reused
+_select_player = select([player_table]).where(player_table.c.steamid==bindparam('b_steamid'))
+
+_select_skills = select([skill_table.c.skill_id, skill_table.c.level]).where(
+    skill_table.c.player_id==bindparam('b_player_id')
+)
+
+_insert_player = player_table.insert()
+
+_insert_skills = skill_table.insert()
+
+_select_player_states = select([
+    player_table.c.id,
+    player_table.c.steamid,
+    player_table.c.version,
+    player_table.c.level,
+    player_table.c.xp,
+    player_table.c.credits,
+]).where(player_table.c.steamid.in_(bindparam('b_steamids', expanding=True)))
+
+_select_players_skills = select([skill_table]).where(
+    skill_table.c.player_id.in_(bindparam('b_player_ids', expanding=True))
+)
+
+_select_skill_keys = select([skill_key_table]).where(
+    skill_key_table.c.key.in_(bindparam('b_keys', expanding=True))
+)
+
+_insert_skill_key = skill_key_table.insert()
+
+_select_player_state = select([
+    player_table.c.version,
+    player_table.c.level,
+    player_table.c.xp,
+    player_table.c.credits,
+]).where(player_table.c.id==bindparam('b_id'))
+
+_update_player_if_version = player_table.update().where(and_(
+    player_table.c.id==bindparam('b_id'),
+    player_table.c.version==bindparam('b_version'),
+)).values(
+    level=bindparam('level'),
+    xp=bindparam('xp'),
+    credits=bindparam('credits'),
+    name=func.coalesce(bindparam('name'), player_table.c.name),  # Keep the name if None
+    version=player_table.c.version + 1,
+)
+
+_skill_level_change = skill_table.c.level + bindparam('change')
+_change_skill_level = skill_table.update().where(and_(
+    skill_table.c.player_id==bindparam('b_player_id'),
+    skill_table.c.skill_id==bindparam('b_skill_id'),
+)).values(
+    level=case([(_skill_level_change < 0, 0)], else_=_skill_level_change),
+)
+
+
+T = TypeVar('T')
+
+# SQLite limits the amount of variables per statement
+_MAX_VARIABLES = 500
+
+
+def _chunks(items: List[T], size: int=_MAX_VARIABLES) -> Iterator[List[T]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ========================
+#  Skill keys
+# ========================
+
+_skill_key_ids: Dict[str, int] = {}
+
+
+@query_stats.operation
+def skill_key_ids(keys: Iterable[str]) -> Dict[str, int]:
+    """Get the database IDs of skill keys, inserting any missing keys.
+
+    The IDs are cached, and missing keys are inserted in their own
+    transaction, so this must not be called while holding a transaction.
+    """
+    keys = list(keys)
+    missing = [key for key in keys if key not in _skill_key_ids]
+    if missing:
+        try:
+            with engine.begin() as conn:
+                existing = {row.key for row in conn.execute(_select_skill_keys, b_keys=missing)}
+                new_keys = [key for key in missing if key not in existing]
+                if new_keys:
+                    conn.execute(_insert_skill_key, [{'key': key} for key in new_keys])
+        except IntegrityError:
+            pass  # Another thread inserted the same keys first
+        with engine.connect() as conn:
+            for row in conn.execute(_select_skill_keys, b_keys=missing):
+                _skill_key_ids[row.key] = row.id
+    return {key: _skill_key_ids[key] for key in keys}
 
 
+# ========================
+#  Players
+# ========================
+
+@query_stats.operation
 def create_player(player: Player) -> None:
     """Insert a new player and their skills into the database.
-    
-    Also sets the skill objects's `_db_id` to match their database ID.
+
+    Also sets the player's and their skill objects's `_db_id`
+    to match the player's database ID and the skills's key IDs.
     """
-    with engine.connect() as conn:
+    key_ids = skill_key_ids(skill.key for skill in player.skills)
+    with engine.begin() as conn:
 
-        conn.execute(
-            player_table.insert().values(
-                steamid=player.steamid,
-                level=player.level,
-                xp=player.xp,
-                credits=player.credits,
-            )
+        result = conn.execute(
+            _insert_player,
+            steamid=player.steamid,
+            level=player.level,
+            xp=player.xp,
+            credits=player.credits,
+            name=player.name,
         )
+        player_id = result.inserted_primary_key[0]
 
-        skills = list(player.skills)
-        result = conn.execute(
-            skill_table.insert().values([
+        conn.execute(
+            _insert_skills,
+            [
                 {
-                    'key': skill.key,
+                    'player_id': player_id,
+                    'skill_id': key_ids[skill.key],
                     'level': skill.level,
-                    'steamid': player.steamid,
                 }
-                for skill in skills
-            ])
+                for skill in player.skills
+            ]
         )
 
-        for id, skill in zip(result.inserted_primary_key, skills):
-            skill._db_id = id
+    player._db_id = player_id
+    player._saved = (player.level, player.xp, player.credits)
+    _player_states[player_id] = PlayerState(0, *player._saved)
+    for skill in player.skills:
+        skill._db_id = key_ids[skill.key]
+        skill._saved_level = skill.level
 
 
+@query_stats.operation
 def save_player(player: Player) -> None:
-    """Update a player's and their skills's data into the database."""
-    with engine.connect() as conn:
+    """Update a player's and all of their skills's data into the database."""
+    snapshot = take_snapshot(player, force=True)
+    if snapshot is not None:
+        save_snapshots([snapshot])
 
-        conn.execute(
-            player_table.update().where(player_table.c.steamid==player.steamid).values(
-                level=player.level,
-                xp=player.xp,
-                credits=player.credits
-            )
-        )
 
-        conn.execute(
-            skill_table.update().where(skill_table.c.id==bindparam('db_id')).values(
-                {
-                    'level': skill.level,
-                    'db_id': skill._db_id
-                }
-                for skill in list(player.skills)
-            )
+@query_stats.operation
+def save_snapshots(snapshots: Iterable[PlayerSnapshot]) -> None:
+    """Write players's snapshots into the database in a single transaction.
+
+    Each player's row is only updated if its version still matches
+    the one this process last loaded or saved. If another process
+    has updated the player in the meantime, the snapshot's changes
+    to XP and credits are merged on top of the other process's values
+    instead of overwriting them. Skill levels are always updated
+    by their changes, so concurrent upgrades add up as well.
+    """
+    snapshots = list(snapshots)
+    if not snapshots:
+        return
+    skill_rows = [
+        {'b_player_id': snapshot.db_id, 'b_skill_id': skill_id, 'change': level - base_level}
+        for snapshot in snapshots
+        for skill_id, (base_level, level) in snapshot.skills.items()
+        if level != base_level
+    ]
+
+    states = {}
+    with engine.begin() as conn:
+        for snapshot in snapshots:
+            states[snapshot.db_id] = _write_player(conn, snapshot)
+        if skill_rows:
+            conn.execute(_change_skill_level, skill_rows)
+
+    # Only trust the new versions once they've been committed
+    _player_states.update(states)
+
+
+class PlayerState(NamedTuple):
+    """A player's row as last loaded or saved by this process.
+
+    The row is `merged` if this process's last write of the player
+    had to be merged with another process's changes, so the row
+    no longer matches the player's data in this process.
+    A later write which goes through unchanged resets it.
+    """
+    version: int
+    level: int
+    xp: int
+    credits: int
+    merged: bool=False
+
+
+_player_states: Dict[int, PlayerState] = {}
+
+# How many times to retry a conflicting update before giving up
+_MAX_WRITE_ATTEMPTS = 5
+
+
+def _write_player(conn, snapshot: PlayerSnapshot, state: Optional[PlayerState]=None) -> PlayerState:
+    """Update a player's row, merging with any conflicting changes.
+
+    The snapshot is first merged on top of `state`, or if it's `None`,
+    on top of the state this process last loaded or saved.
+    Returns the player's new state in the database.
+    """
+    if state is None:
+        state = _player_states.get(snapshot.db_id)
+    reloaded = state is None
+    for _ in range(_MAX_WRITE_ATTEMPTS):
+        if state is None:
+            row = conn.execute(_select_player_state, b_id=snapshot.db_id).first()
+            if row is None:
+                raise LookupError(f"Player '{snapshot.steamid}' doesn't exist in the database")
+            state = PlayerState(*row)
+            reloaded = True
+        level, xp, credits = merge_progress(state, snapshot)
+        result = conn.execute(
+            _update_player_if_version,
+            b_id=snapshot.db_id,
+            b_version=state.version,
+            level=level,
+            xp=xp,
+            credits=credits,
+            name=snapshot.name,
         )
+        if result.rowcount == 1:
+            merged = reloaded or (level, xp, credits) != (snapshot.level, snapshot.xp, snapshot.credits)
+            return PlayerState(state.version + 1, level, xp, credits, merged)
+        state = None  # Someone else updated the player, reload and merge
+    raise RuntimeError(f"Unable to save player '{snapshot.steamid}' due to concurrent updates")
+
+
+def is_current(data: PlayerData) -> bool:
+    """Check if a player's data cached by this process is still current.
+
+    Only checks the state this process last loaded or wrote,
+    without querying the database, so it's cheap enough for the game thread.
+    The data is stale if this process's last write of the player
+    had to be merged with another process's changes.
+    Other processes's changes since then are only noticed by the
+    next write, which merges them instead of overwriting them,
+    so restoring stale data never loses any progress.
+    """
+    state = _player_states.get(data.db_id)
+    return state is not None and not state.merged
+
+
+def merge_progress(state: PlayerState, snapshot: PlayerSnapshot) -> Tuple[int, int, int]:
+    """Apply a snapshot's changes on top of a player's state in the database.
+
+    If the state still matches the snapshot's base values,
+    the snapshot's values are used as they are. Otherwise the change
+    in the snapshot's total XP (counting the levels too) and credits
+    is added to the state's values, and the level is recalculated.
+    Returns the merged `(level, xp, credits)` tuple.
+    """
+    if (state.level, state.xp, state.credits) == snapshot.base:
+        return snapshot.level, snapshot.xp, snapshot.credits
+    base, per_level = config.REQUIRED_XP['base'], config.REQUIRED_XP['per_level']
+    base_level, base_xp, base_credits = snapshot.base
+    xp_change = (
+        levels_to_xp(snapshot.level, 0, base, per_level) + snapshot.xp
+        - levels_to_xp(base_level, 0, base, per_level) - base_xp
+    )
+    total_xp = max(levels_to_xp(state.level, 0, base, per_level) + state.xp + xp_change, 0)
+    level, xp = xp_to_levels(total_xp, 0, base, per_level)
+    return level, xp, state.credits + snapshot.credits - base_credits
+
 
+@query_stats.operation
+def apply_journal(player_records: PlayerRecords, skill_records: SkillRecords) -> None:
+    """Write replayed journal records into the database in a single transaction.
 
+    The records are merged on top of the database's values like snapshots,
+    so changes made by other servers since the crash aren't overwritten.
+    Records already matching the database were saved before the crash,
+    and others are merged from the latest of their bases that matches
+    the database, since the changes up to that base were saved.
+    If none of them match, another server has changed the player,
+    and the record is merged from its earliest base, which is what
+    the player had been saved as before the journaled changes.
+    See `rpg.journal.Journal.read()` for the records's format.
+    """
+    key_ids = skill_key_ids({key for (_, key) in skill_records})
+    steamids = list(set(player_records) | {steamid for (steamid, _) in skill_records})
+    with engine.begin() as conn:
+
+        if _legacy_pending:
+            for chunk in _chunks(steamids):
+                _migrate_legacy_players(conn, chunk)
+
+        player_ids, states = {}, {}
+        for chunk in _chunks(steamids):
+            for row in conn.execute(_select_player_states, b_steamids=chunk):
+                player_ids[row.steamid] = row.id
+                states[row.steamid] = PlayerState(row.version, row.level, row.xp, row.credits, merged=True)
+
+        for steamid, ((level, xp, credits), bases) in player_records.items():
+            state = states.get(steamid)
+            if state is None:
+                continue
+            base = _journal_base((state.level, state.xp, state.credits), (level, xp, credits), bases)
+            snapshot = PlayerSnapshot(steamid, player_ids[steamid], None, level, xp, credits, base, {})
+            _write_player(conn, snapshot, state)
+
+        skill_levels = {}
+        for chunk in _chunks(list(player_ids.values())):
+            for row in conn.execute(_select_players_skills, b_player_ids=chunk):
+                skill_levels[row.player_id, row.skill_id] = row.level
+        skill_rows = []
+        for (steamid, key), (level, bases) in skill_records.items():
+            current = skill_levels.get((player_ids.get(steamid), key_ids[key]))
+            if current is None:
+                continue
+            change = level - _journal_base(current, level, bases)
+            if change:
+                skill_rows.append({'b_player_id': player_ids[steamid], 'b_skill_id': key_ids[key], 'change': change})
+        if skill_rows:
+            conn.execute(_change_skill_level, skill_rows)
+
+    # The journaled values bumped the players's versions
+    for player_id in player_ids.values():
+        _player_states.pop(player_id, None)
+
+
+def _journal_base(current: T, value: T, bases: List[T]) -> T:
+    """Pick the base to merge a journaled `value` from, given the database's `current` value."""
+    if not bases or current == value or current in bases:
+        return current
+    return bases[0]
+
+
+@query_stats.operation
 def load_player(player: Player) -> bool:
     """Fetch a player's and their skills's data from the database.
-    
+
     Returns `False` if there was no match for the player's steamid.
     """
+    data = _fetch_player_data(player.steamid, [skill.key for skill in player.skills], create=False)
+    if data is None:
+        return False
+    apply_player_data(player, data)
+    return True
+
+
+@query_stats.operation
+def fetch_player_data(steamid: str, skill_keys: Iterable[str]) -> PlayerData:
+    """Fetch a player's and their skills's data from the database.
+
+    Inserts the player and any of their missing skills
+    with zero progress, so the returned data is always complete.
+    Doesn't touch any player objects, so it's safe to call
+    from other threads than the game thread.
+    """
+    return _fetch_player_data(steamid, list(skill_keys), create=True)
+
+
+def _fetch_player_data(steamid: str, skill_keys: List[str], *, create: bool) -> Optional[PlayerData]:
+    """Fetch a player's data, migrating them from the legacy tables if needed.
+
+    Returns `None` for unknown players, unless `create` is set.
+    If another thread or server inserts the same player or skills
+    at the same time, the rows already exist, so they're selected again.
+    """
+    key_ids = skill_key_ids(skill_keys)
+    try:
+        return _fetch_player_data_once(steamid, skill_keys, key_ids, create)
+    except IntegrityError:
+        return _fetch_player_data_once(steamid, skill_keys, key_ids, create)
+
+
+def _fetch_player_data_once(
+    steamid: str,
+    skill_keys: List[str],
+    key_ids: Dict[str, int],
+    create: bool,
+) -> Optional[PlayerData]:
+    with engine.begin() as conn:
+
+        if _legacy_pending:
+            _migrate_legacy_players(conn, [steamid])
+
+        player_data = conn.execute(_select_player, b_steamid=steamid).first()
+        if player_data is not None:
+            player_id = player_data.id
+            state = PlayerState(player_data.version, player_data.level, player_data.xp, player_data.credits)
+        elif create:
+            result = conn.execute(_insert_player, steamid=steamid, level=0, xp=0, credits=0, version=0)
+            player_id, state = result.inserted_primary_key[0], PlayerState(0, 0, 0, 0)
+        else:
+            return None
+
+        result = conn.execute(_select_skills, b_player_id=player_id)
+        levels = {row.skill_id: row.level for row in result}
+        missing_ids = [key_ids[key] for key in skill_keys if key_ids[key] not in levels]
+        if missing_ids:
+            conn.execute(
+                _insert_skills,
+                [{'player_id': player_id, 'skill_id': skill_id, 'level': 0} for skill_id in missing_ids]
+            )
+
+    _player_states[player_id] = state
+    skills = {key: (key_ids[key], levels.get(key_ids[key], 0)) for key in skill_keys}
+    return PlayerData(player_id, state.level, state.xp, state.credits, skills)
+
+
+_select_leaderboard_page = (
+    select([player_table.c.id, player_table.c.steamid, player_table.c.name, player_table.c.level, player_table.c.xp])
+    .where(player_table.c.id > bindparam('b_after'))
+    .order_by(player_table.c.id)
+    .limit(bindparam('b_limit'))
+)
+
+_select_legacy_leaderboard_page = (
+    select([legacy_player_table.c.steamid, null(), legacy_player_table.c.level, legacy_player_table.c.xp])
+    .where(legacy_player_table.c.steamid > bindparam('b_after'))
+    .where(~exists().where(player_table.c.steamid==legacy_player_table.c.steamid))
+    .order_by(legacy_player_table.c.steamid)
+    .limit(bindparam('b_limit'))
+)
+
+
+@query_stats.operation
+def fetch_leaderboard(page_size: int=1000) -> Iterator[Tuple[str, Optional[str], int, int]]:
+    """Fetch every player's `(steamid, name, level, xp)` in no particular order.
+
+    The rows are read in pages of `page_size` players,
+    each in its own short transaction so the database
+    is never locked for the whole read.
+    Players who haven't been migrated from the legacy tables yet
+    are read first, so a player migrated during the read is
+    fetched again from the new tables with their latest data.
+    """
+    if _legacy_pending:
+        after = ''
+        while True:
+            with engine.connect() as conn:
+                rows = conn.execute(_select_legacy_leaderboard_page, b_after=after, b_limit=page_size).fetchall()
+            yield from rows
+            if len(rows) < page_size:
+                break
+            after = rows[-1][0]
+
+    after = 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(_select_leaderboard_page, b_after=after, b_limit=page_size).fetchall()
+        for player_id, steamid, name, level, xp in rows:
+            yield steamid, name, level, xp
+        if len(rows) < page_size:
+            break
+        after = rows[-1][0]
+
+
+# ========================
+#  Legacy migration
+# ========================
+
+_LEGACY_MIGRATION = 'legacy_schema'
+
+_select_migration = select([migration_table]).where(migration_table.c.name==bindparam('b_name'))
+
+_insert_migration = migration_table.insert()
+
+_update_migration = migration_table.update().where(migration_table.c.name==bindparam('b_name')).values(
+    position=bindparam('position'),
+    done=bindparam('done'),
+)
+
+_select_legacy_steamids = (
+    select([legacy_player_table.c.steamid])
+    .order_by(legacy_player_table.c.steamid)
+    .limit(bindparam('b_limit'))
+)
+
+_select_legacy_steamids_after = _select_legacy_steamids.where(
+    legacy_player_table.c.steamid > bindparam('b_position')
+)
+
+
+def _check_legacy_migration() -> bool:
+    """Check if there are legacy tables which haven't been fully migrated."""
     with engine.connect() as conn:
+        for table in legacy_metadata.sorted_tables:
+            if not engine.dialect.has_table(conn, table.name):
+                return False
+        row = conn.execute(
+            select([migration_table.c.done]).where(migration_table.c.name==_LEGACY_MIGRATION)
+        ).first()
+    return row is None or not row.done
 
-        result = conn.execute(
-            select([player_table]).where(player_table.c.steamid==player.steamid)
+
+_legacy_pending = _check_legacy_migration()
+
+
+def legacy_migration_pending() -> bool:
+    """Whether players still need to be migrated from the legacy tables.
+
+    Until the migration is done, players are also migrated
+    one by one whenever they are loaded.
+    """
+    return _legacy_pending
+
+
+@query_stats.operation
+def prepare_legacy_migration() -> bool:
+    """Check that the legacy skill table is indexed by steamid.
+
+    Without the index, finding a legacy player's skills would
+    require scanning the whole table. Creating the index locks
+    the database until it's done, so it's only created here if the
+    table has at most `LEGACY_INDEX_MAX_ROWS` rows, and bigger
+    tables must be indexed offline with `rpg.transfer index-legacy`.
+    Returns whether the index exists.
+    """
+    if has_index(engine, legacy_skill_index):
+        return True
+    with engine.connect() as conn:
+        rows = conn.execute(select([func.max(legacy_skill_table.c.id)])).scalar() or 0
+    if rows > config.LEGACY_INDEX_MAX_ROWS:
+        print(
+            f'Not migrating the legacy tables in the background, since their skill table'
+            f' of about {rows} rows isn\'t indexed by steamid. Stop the server and run'
+            ' "python -m rpg.transfer index-legacy <database URL>" from the plugins directory.'
         )
-        player_data = result.first()
-        if player_data is None:
+        return False
+    create_missing_index(engine, legacy_skill_index)
+    return True
+
+
+@query_stats.operation
+def migrate_legacy_batch(batch_size: int) -> bool:
+    """Migrate the next batch of players from the legacy tables.
+
+    Players are migrated in steamid order, and the last migrated
+    steamid is checkpointed in the same transaction,
+    so an interrupted migration resumes from where it left off.
+    Returns `False` once every player has been migrated.
+    """
+    global _legacy_pending
+    with engine.begin() as conn:
+
+        row = conn.execute(_select_migration, b_name=_LEGACY_MIGRATION).first()
+        if row is None:
+            conn.execute(_insert_migration, name=_LEGACY_MIGRATION, position=None, done=False)
+            position = None
+        elif row.done:
+            _legacy_pending = False
             return False
-        player._level = player_data.level
-        player._xp = player_data.xp
-        player.credits = player_data.credits
+        else:
+            position = row.position
 
-        result = conn.execute(
-            select([skill_table]).where(skill_table.c.steamid==player.steamid)
-        )
-        for skill_data in result:
-            skill = player.get_skill(skill_data.key)
-            if skill is not None:
-                 skill.level = skill_data.level
-                 skill._db_id = skill_data.id
+        if position is None:
+            result = conn.execute(_select_legacy_steamids, b_limit=batch_size)
+        else:
+            result = conn.execute(_select_legacy_steamids_after, b_limit=batch_size, b_position=position)
+        steamids = [row.steamid for row in result]
+        if steamids:
+            for chunk in _chunks(steamids):
+                _migrate_legacy_players(conn, chunk)
+            position = steamids[-1]
 
-    return True
+        conn.execute(_update_migration, b_name=_LEGACY_MIGRATION, position=position, done=not steamids)
+
+    if not steamids:
+        _legacy_pending = False
+    return bool(steamids)
+
+
+_legacy_steamids = bindparam('b_steamids', expanding=True)
+
+_migrate_legacy_player_rows = player_table.insert().from_select(
+    ['steamid', 'level', 'xp', 'credits'],
+    select([
+        legacy_player_table.c.steamid,
+        legacy_player_table.c.level,
+        legacy_player_table.c.xp,
+        legacy_player_table.c.credits,
+    ]).where(and_(
+        legacy_player_table.c.steamid.in_(_legacy_steamids),
+        ~exists().where(player_table.c.steamid==legacy_player_table.c.steamid),
+    ))
+)
+
+_migrate_legacy_skill_keys = skill_key_table.insert().from_select(
+    ['key'],
+    select([legacy_skill_table.c.key]).distinct().where(and_(
+        legacy_skill_table.c.steamid.in_(_legacy_steamids),
+        ~exists().where(skill_key_table.c.key==legacy_skill_table.c.key),
+    ))
+)
+
+_migrate_legacy_skill_rows = skill_table.insert().from_select(
+    ['player_id', 'skill_id', 'level'],
+    select([
+        player_table.c.id,
+        skill_key_table.c.id,
+        func.max(legacy_skill_table.c.level),
+    ]).select_from(
+        legacy_skill_table
+        .join(player_table, player_table.c.steamid==legacy_skill_table.c.steamid)
+        .join(skill_key_table, skill_key_table.c.key==legacy_skill_table.c.key)
+    ).where(and_(
+        legacy_skill_table.c.steamid.in_(_legacy_steamids),
+        ~exists().where(and_(
+            skill_table.c.player_id==player_table.c.id,
+            skill_table.c.skill_id==skill_key_table.c.id,
+        )),
+    )).group_by(
+        player_table.c.id,
+        skill_key_table.c.id,
+    )
+)
+
+
+def _migrate_legacy_players(conn, steamids: List[str]) -> None:
+    """Copy players and their skills from the legacy tables.
+
+    Players and skills which already exist in the new tables
+    are skipped, so newer data is never overwritten.
+    A player's skills are always migrated in the same transaction
+    as the player, so the skills are only looked up
+    if some of the players weren't migrated yet.
+    Each step is a single `INSERT ... SELECT` statement,
+    which keeps it atomic with concurrent loads and batches.
+    """
+    result = conn.execute(_migrate_legacy_player_rows, b_steamids=steamids)
+    if result.rowcount == 0:
+        return
+    conn.execute(_migrate_legacy_skill_keys, b_steamids=steamids)
+    conn.execute(_migrate_legacy_skill_rows, b_steamids=steamids)
@@ -0,0 +1,182 @@
+# Python imports
+import os
+from queue import SimpleQueue
+from threading import Thread
+from traceback import print_exc
+from typing import Dict, IO, List, Optional, Tuple
+
+# Source.Python imports
+from path import Path
+
+
+Progress = Tuple[int, int, int]  # (level, xp, credits)
+PlayerRecords = Dict[str, Tuple[Progress, List[Progress]]]
+SkillRecords = Dict[Tuple[str, str], Tuple[int, List[int]]]
+
+
+class Journal:
+    """Append-only journal of players's progression between full saves.
+
+    Each change is appended as the player's or skill's new absolute value
+    along with the base value it was last saved as, so replaying a segment
+    is idempotent even if some of its changes had already been saved,
+    and it can still be merged with other servers's changes.
+    Records are written into buffered segment files in the `directory`,
+    and they are only flushed to disk when calling `sync()`.
+    The slow fsyncs, closing of segments, and deleting of
+    discarded segments are done in order on a background thread,
+    so none of the journal's methods wait for the disk.
+
+    Before taking a full save's snapshots, `rotate()` should be called
+    to start a new segment. Once the save has succeeded,
+    the rotated segment is no longer needed and can be `discard()`ed.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._path = None
+        self._number = max((self._segment_number(path) for path in self.segments()), default=0)
+        self._unsynced = False
+        self._sync_queued = False
+        self._tasks: SimpleQueue = SimpleQueue()  # (function, argument) or None to stop
+        self._syncer: Optional[Thread] = Thread(target=self._run_syncer, name='rpg-journal-sync', daemon=True)
+        self._syncer.start()
+
+    def segments(self) -> List[Path]:
+        """Get paths to every segment file in the order they were written."""
+        return sorted(self.directory.glob('segment-*.log'), key=self._segment_number)
+
+    @staticmethod
+    def _segment_number(path: Path) -> int:
+        return int(path.stem.split('-')[1])
+
+    def record_player(self, steamid: str, level: int, xp: int, credits: int, base: Progress) -> None:
+        """Record a player's new level, XP, and credits, changed from the saved `base`."""
+        self._write(f'P\t{steamid}\t{level}\t{xp}\t{credits}\t{base[0]}\t{base[1]}\t{base[2]}\n')
+
+    def record_skill(self, steamid: str, key: str, level: int, base_level: int) -> None:
+        """Record a player's skill's new level, changed from the saved `base_level`."""
+        self._write(f'S\t{steamid}\t{key}\t{level}\t{base_level}\n')
+
+    def _write(self, line: str) -> None:
+        if self._file is None:
+            self._number += 1
+            self._path = self.directory / f'segment-{self._number:08d}.log'
+            self._file = open(self._path, 'a', encoding='utf-8')
+        self._file.write(line)
+        self._unsynced = True
+
+    def sync(self) -> None:
+        """Flush the buffered records and fsync them in the background."""
+        if not self._unsynced:
+            return
+        self._file.flush()
+        self._unsynced = False
+        if not self._sync_queued:
+            self._sync_queued = True
+            self._tasks.put((self._fsync, self._file))
+
+    def rotate(self) -> List[Path]:
+        """Close the current segment so further records go to a new one.
+
+        Returns the path to the closed segment in a list,
+        or an empty list if nothing was recorded since the last rotation.
+        Older segments are left for their own saves to discard.
+        """
+        if self._file is None:
+            return []
+        self._file.flush()
+        self._tasks.put((self._fsync_and_close, self._file))
+        self._file = None
+        self._unsynced = False
+        self._sync_queued = False
+        return [self._path]
+
+    def discard(self, segments: List[Path]) -> None:
+        """Delete segments whose changes have been saved to the database.
+
+        The segments are deleted once they've been synced and closed.
+        """
+        self._tasks.put((self._unlink, segments))
+
+    def close(self) -> None:
+        """Close the current segment, waiting for everything to be synced.
+
+        The journal can't be used after closing it.
+        """
+        self.rotate()
+        if self._syncer is not None:
+            self._tasks.put(None)
+            self._syncer.join()
+            self._syncer = None
+
+    def _run_syncer(self) -> None:
+        """Run the disk operations queued by the game thread until closed."""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            function, argument = task
+            try:
+                function(argument)
+            except Exception:
+                print_exc()
+
+    def _fsync(self, file: IO[str]) -> None:
+        self._sync_queued = False
+        os.fsync(file.fileno())
+
+    @staticmethod
+    def _fsync_and_close(file: IO[str]) -> None:
+        try:
+            os.fsync(file.fileno())
+        finally:
+            file.close()
+
+    @staticmethod
+    def _unlink(segments: List[Path]) -> None:
+        for path in segments:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def read(self) -> Tuple[PlayerRecords, SkillRecords]:
+        """Read the latest values from every closed segment.
+
+        Returns players's `{steamid: ((level, xp, credits), bases)}`
+        and skills's `{(steamid, key): (level, bases)}` dicts,
+        where `bases` lists the distinct base values the records
+        were changed from, in the order they were recorded.
+        Records written before the bases were journaled have none.
+        Ignores malformed and unterminated lines,
+        such as one that was cut short by a crash.
+        """
+        players, skills = {}, {}
+        player_bases, skill_bases = {}, {}
+        for path in self.segments():
+            if self._file is not None and self._segment_number(path) == self._number:
+                continue
+            with open(path, encoding='utf-8', errors='replace') as segment:
+                for line in segment:
+                    if not line.endswith('\n'):
+                        continue
+                    fields = line[:-1].split('\t')
+                    try:
+                        if fields[0] == 'P' and len(fields) in (5, 8):
+                            values = tuple(map(int, fields[2:]))
+                            bases = player_bases.setdefault(fields[1], [])
+                            players[fields[1]] = (values[:3], bases)
+                            if len(values) == 6 and (not bases or bases[-1] != values[3:]):
+                                bases.append(values[3:])
+                        elif fields[0] == 'S' and len(fields) in (4, 5):
+                            values = tuple(map(int, fields[3:]))
+                            bases = skill_bases.setdefault((fields[1], fields[2]), [])
+                            skills[fields[1], fields[2]] = (values[0], bases)
+                            if len(values) == 2 and (not bases or bases[-1] != values[1]):
+                                bases.append(values[1])
+                    except ValueError:
+                        continue
+        return players, skills
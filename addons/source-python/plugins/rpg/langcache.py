@@ -0,0 +1,91 @@
+# Python imports
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Source.Python imports
+from translations.strings import TranslationStrings
+
+
+_IMMUTABLE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+def _is_immutable(value: Any) -> bool:
+    """Check if a token's value can be used as part of a memoization key.
+
+    Tuples (including named tuples) of immutable values are accepted,
+    any other objects could change between renders.
+    """
+    if type(value) in _IMMUTABLE_TYPES:
+        return True
+    return isinstance(value, tuple) and all(_is_immutable(item) for item in value)
+
+
+_Template = Tuple[Callable[..., str], Dict[str, Any], Optional[str]]
+
+
+class CachedTranslation:
+    """Translation with its languages resolved and templates compiled once.
+
+    Each requested language is resolved to one of the translation's
+    actual languages only once, and its template is parsed to find out
+    whether it has any fields at all. Templates without fields are
+    formatted once, and other renders are memoized by their tokens,
+    as long as every token is an immutable value like a number.
+    Tokens with other objects, like players, are formatted every time.
+    """
+
+    def __init__(self, strings: TranslationStrings, maxsize: int=256) -> None:
+        self.strings = strings
+        self._templates: Dict[Optional[str], _Template] = {}
+        self._render = lru_cache(maxsize)(self._format)
+
+    def _compile(self, language: Optional[str]) -> _Template:
+        resolved = self.strings.get_language(language)
+        text = '' if resolved is None else self.strings[resolved]
+        static_tokens = dict(getattr(self.strings, 'tokens', {}))
+        has_fields = any(field is not None for _, field, _, _ in Formatter().parse(text))
+        constant = None if has_fields else text.format()
+        template = self._templates[language] = (text.format, static_tokens, constant)
+        return template
+
+    def _format(self, language: Optional[str], tokens: Tuple[Tuple[str, Any], ...]) -> str:
+        format_, static_tokens, _ = self._templates[language]
+        return format_(**{**static_tokens, **dict(tokens)})
+
+    def get_string(self, language: Optional[str]=None, **tokens: Any) -> str:
+        """Get the translation formatted with the tokens, like `TranslationStrings.get_string()`."""
+        try:
+            format_, static_tokens, constant = self._templates[language]
+        except KeyError:
+            format_, static_tokens, constant = self._compile(language)
+        if constant is not None:
+            return constant
+        for value in tokens.values():
+            if type(value) not in _IMMUTABLE_TYPES and not _is_immutable(value):
+                return format_(**{**static_tokens, **tokens})
+        return self._render(language, tuple(tokens.items()))
+
+
+class TranslationCache:
+    """Cache of `CachedTranslation`s for any `TranslationStrings`.
+
+    Call the cache with a `TranslationStrings` object to get
+    its cached translation. The objects are kept alive by the cache,
+    so `clear()` should be called after replacing any of them,
+    like when reloading skills.
+    """
+
+    def __init__(self, maxsize: int=256) -> None:
+        self.maxsize = maxsize
+        self._translations: Dict[int, CachedTranslation] = {}
+
+    def __call__(self, strings: TranslationStrings) -> CachedTranslation:
+        translation = self._translations.get(id(strings))
+        if translation is None:
+            translation = self._translations[id(strings)] = CachedTranslation(strings, self.maxsize)
+        return translation
+
+    def clear(self) -> None:
+        """Forget every cached translation."""
+        self._translations.clear()
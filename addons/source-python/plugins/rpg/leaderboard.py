@@ -0,0 +1,307 @@
+# Python imports
+from bisect import bisect_left, insort
+from itertools import islice
+from threading import Event, Thread
+from traceback import print_exc
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class LeaderboardEntry(NamedTuple):
+    """A player's position on the leaderboard."""
+    rank: int
+    steamid: str
+    name: str
+    level: int
+    xp: int
+
+
+RankKey = Tuple[int, int, str]  # (-level, -xp, steamid)
+
+
+class _SortedList:
+    """Sorted list of rank keys with positional lookups in O(log n).
+
+    The keys are split into sublists of at most `2 * _LOAD` keys,
+    with a Fenwick tree counting the keys in each sublist.
+    Adding or removing a key finds its sublist with a binary search
+    and updates the tree in O(log n), besides shifting the keys
+    of that one bounded sublist. Only splitting or dropping
+    a sublist rebuilds the tree, once per `_LOAD` changes at most.
+    """
+
+    # Amount of keys a sublist is split into
+    _LOAD = 512
+
+    def __init__(self, keys: Iterable[RankKey]=()) -> None:
+        keys = sorted(keys)
+        self._lists = [keys[i:i + self._LOAD] for i in range(0, len(keys), self._LOAD)]
+        self._maxes = [sublist[-1] for sublist in self._lists]
+        self._len = len(keys)
+        self._build_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _build_tree(self) -> None:
+        tree = [0] + [len(sublist) for sublist in self._lists]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add_count(self, sublist_index: int, amount: int) -> None:
+        tree = self._tree
+        i = sublist_index + 1
+        while i < len(tree):
+            tree[i] += amount
+            i += i & -i
+
+    def _count_before(self, sublist_index: int) -> int:
+        """Count the keys in the sublists before `sublist_index`."""
+        tree = self._tree
+        i = sublist_index
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, key: RankKey) -> None:
+        """Insert a key into its sorted position."""
+        self._len += 1
+        if not self._lists:
+            self._lists.append([key])
+            self._maxes.append(key)
+            self._build_tree()
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._lists[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._lists[i], key)
+        sublist = self._lists[i]
+        if len(sublist) > 2 * self._LOAD:
+            self._lists.insert(i + 1, sublist[self._LOAD:])
+            del sublist[self._LOAD:]
+            self._maxes.insert(i, sublist[-1])
+            self._build_tree()
+        else:
+            self._add_count(i, 1)
+
+    def remove(self, key: RankKey) -> None:
+        """Remove a key, which must be in the list."""
+        i = bisect_left(self._maxes, key)
+        sublist = self._lists[i]
+        del sublist[bisect_left(sublist, key)]
+        self._len -= 1
+        if sublist:
+            self._maxes[i] = sublist[-1]
+            self._add_count(i, -1)
+        else:
+            del self._lists[i]
+            del self._maxes[i]
+            self._build_tree()
+
+    def index(self, key: RankKey) -> int:
+        """Get the position of a key, which must be in the list."""
+        i = bisect_left(self._maxes, key)
+        return self._count_before(i) + bisect_left(self._lists[i], key)
+
+    def islice(self, start: int, stop: int) -> Iterator[RankKey]:
+        """Iterate over the keys from position `start` up to `stop`."""
+        if start >= min(stop, self._len):
+            return
+        # Walk down the Fenwick tree to the sublist containing `start`
+        tree = self._tree
+        i, offset = 0, start
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if i + step < len(tree) and tree[i + step] <= offset:
+                i += step
+                offset -= tree[i]
+            step >>= 1
+        remaining = stop - start
+        for sublist in islice(self._lists, i, None):
+            for key in islice(sublist, offset, offset + remaining):
+                yield key
+                remaining -= 1
+            if remaining <= 0:
+                return
+            offset = 0
+
+
+class Leaderboard:
+    """In-memory ranking of players by their level and XP.
+
+    Players are kept in a sorted list of their rank keys,
+    so both updating a player and looking up their rank take
+    O(log n) time, and top-N pages are read straight from the list.
+
+    Players with equal level and XP are ordered by their steamid.
+    Every player takes roughly 400 bytes of memory,
+    or about 400 MB per million players.
+    """
+
+    def __init__(self) -> None:
+        self._players: Dict[str, Tuple[int, int, str]] = {}  # steamid: (level, xp, name)
+        self._ranking = _SortedList()
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __contains__(self, steamid: str) -> bool:
+        return steamid in self._players
+
+    def load(self, players: Iterable[Tuple[str, Optional[str], int, int]]) -> None:
+        """Replace the leaderboard's players with `(steamid, name, level, xp)` tuples.
+
+        The tuples can be in any order, and the last one of a steamid wins.
+        """
+        self._players.clear()
+        for steamid, name, level, xp in players:
+            self._players[steamid] = (level, xp, name or steamid)
+        self._ranking = _SortedList((-level, -xp, steamid) for steamid, (level, xp, _) in self._players.items())
+
+    def replace(self, loaded: 'Leaderboard') -> None:
+        """Take over the players of a leaderboard loaded in the background.
+
+        Players updated into this leaderboard in the meantime are kept,
+        since they're newer than the loaded ones.
+        The `loaded` leaderboard shouldn't be used afterwards.
+        """
+        for steamid, (level, xp, name) in self._players.items():
+            loaded.update(steamid, level, xp, name)
+        self._players = loaded._players
+        self._ranking = loaded._ranking
+
+    def update(self, steamid: str, level: int, xp: int, name: Optional[str]=None) -> None:
+        """Add a player or update their level and XP.
+
+        Keeps the player's previous name if `name` is `None`.
+        """
+        old = self._players.get(steamid)
+        if old is not None:
+            old_level, old_xp, old_name = old
+            if name is None:
+                name = old_name
+            if old_level == level and old_xp == xp:
+                self._players[steamid] = (level, xp, name)
+                return
+            self._ranking.remove((-old_level, -old_xp, steamid))
+        elif name is None:
+            name = steamid
+        self._players[steamid] = (level, xp, name)
+        self._ranking.add((-level, -xp, steamid))
+
+    def remove(self, steamid: str) -> None:
+        """Remove a player from the leaderboard, if they're on it."""
+        old = self._players.pop(steamid, None)
+        if old is not None:
+            self._ranking.remove((-old[0], -old[1], steamid))
+
+    def rank(self, steamid: str) -> Optional[int]:
+        """Get a player's rank, starting from 1, or `None` if they aren't ranked."""
+        player = self._players.get(steamid)
+        if player is None:
+            return None
+        level, xp, _ = player
+        return self._ranking.index((-level, -xp, steamid)) + 1
+
+    def page(self, start: int, count: int) -> List[LeaderboardEntry]:
+        """Get `count` entries starting from the rank `start + 1`."""
+        return [
+            LeaderboardEntry(rank, steamid, self._players[steamid][2], -level, -xp)
+            for rank, (level, xp, steamid) in enumerate(self._ranking.islice(start, start + count), start + 1)
+        ]
+
+    def top(self, count: int) -> List[LeaderboardEntry]:
+        """Get the `count` highest ranked players."""
+        return self.page(0, count)
+
+    def around(self, steamid: str, radius: int) -> List[LeaderboardEntry]:
+        """Get a player's entry and up to `radius` entries on both sides of it."""
+        rank = self.rank(steamid)
+        if rank is None:
+            return []
+        start = max(rank - 1 - radius, 0)
+        return self.page(start, rank - start + radius)
+
+
+class LeaderboardLoader:
+    """Load a leaderboard's players from the database on a background thread.
+
+    The `(steamid, name, level, xp)` tuples from the `fetch` callback
+    are loaded into a new leaderboard, which replaces the players
+    of the live one on the game thread whenever `process_loaded()`
+    is called, which should happen once per tick.
+    Until then the live leaderboard only has the players updated into it.
+    Failed loads are retried after `retry_delay` seconds.
+    """
+
+    def __init__(self,
+        leaderboard: Leaderboard,
+        fetch: Callable[[], Iterable[Tuple[str, Optional[str], int, int]]],
+        *,
+        retry_delay: float=5.0,
+    ) -> None:
+        self.leaderboard = leaderboard
+        self._fetch = fetch
+        self.retry_delay = retry_delay
+        self._loaded: Optional[Leaderboard] = None
+        self._stopped = Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the leaderboard is still being loaded."""
+        return self._thread is not None and self._thread.is_alive() or self._loaded is not None
+
+    def start(self) -> None:
+        """Start loading the leaderboard on the background thread."""
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name='rpg-leaderboard', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float]=None) -> None:
+        """Abandon the load, waiting for the thread to finish its current page."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._loaded = None
+
+    def process_loaded(self) -> None:
+        """Replace the live leaderboard's players once the load has finished."""
+        loaded = self._loaded
+        if loaded is not None:
+            self._loaded = None
+            self.leaderboard.replace(loaded)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            loaded = Leaderboard()
+            try:
+                loaded.load(self._rows())
+            except _Stopped:
+                return
+            except Exception:
+                print('Unable to load the leaderboard, retrying')
+                print_exc()
+                self._stopped.wait(self.retry_delay)
+                continue
+            self._loaded = loaded
+            return
+
+    def _rows(self) -> Iterable[Tuple[str, Optional[str], int, int]]:
+        for row in self._fetch():
+            if self._stopped.is_set():
+                raise _Stopped
+            yield row
+
+
+class _Stopped(Exception):
+    """Raised inside a `LeaderboardLoader`'s load when it's stopped."""
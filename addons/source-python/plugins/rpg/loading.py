@@ -0,0 +1,114 @@
+# Python imports
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+from time import monotonic
+from traceback import print_exception
+from typing import Callable, Dict, List, Optional, Tuple
+
+# RPG imports
+from .persistence import PlayerData
+from .player import Player
+
+
+FetchCallback = Callable[[str, List[str]], PlayerData]
+LoadedCallback = Callable[[Player, PlayerData], None]
+
+
+class PlayerLoader:
+    """Load players's data from the database on worker threads.
+
+    Players are put into their provisional loading state with `submit()`,
+    and their data is fetched on a thread pool using the `fetch` callback.
+    The finished loads are handed to the `on_loaded` callback
+    on the game thread whenever `process_loaded()` is called,
+    which should happen once per tick.
+
+    A load can use a different fetch function than the default `fetch`,
+    like for checking if cached data is still current.
+    Failed loads are retried after `retry_delay` seconds,
+    doubling the delay after each failure up to `max_retry_delay`,
+    until the load succeeds or the player is `discard()`ed.
+    Loads of discarded players, or of players whose index has
+    been taken by a newer player, are dropped once they finish.
+    """
+
+    def __init__(self,
+        fetch: FetchCallback,
+        on_loaded: LoadedCallback,
+        *,
+        max_workers: int=2,
+        retry_delay: float=1.0,
+        max_retry_delay: float=30.0,
+        clock: Callable[[], float]=monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self._on_loaded = on_loaded
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='rpg-loader')
+        self._loaded = SimpleQueue()
+        self._loading: Dict[int, Player] = {}  # index: player
+        self._retries: Dict[int, Tuple[Player, FetchCallback, int, float]] = {}  # index: (player, fetch, failures, time)
+
+    def submit(self, player: Player, fetch: Optional[FetchCallback]=None) -> None:
+        """Start loading a player's data in the background.
+
+        Uses the `fetch` callback if one is passed, instead of the default.
+        """
+        player.begin_loading()
+        self._loading[player.index] = player
+        self._retries.pop(player.index, None)
+        self._submit(player, fetch or self._fetch, 0)
+
+    def _submit(self, player: Player, fetch: FetchCallback, failures: int) -> None:
+        skill_keys = [skill.key for skill in player.skills]
+        future = self._executor.submit(fetch, player.steamid, skill_keys)
+        future.add_done_callback(lambda future: self._loaded.put((player, fetch, failures, future)))
+
+    def discard(self, player: Player) -> None:
+        """Stop loading a player, like when they leave.
+
+        A load still in progress is dropped once it finishes.
+        """
+        if self._loading.get(player.index) is player:
+            del self._loading[player.index]
+            self._retries.pop(player.index, None)
+
+    def process_loaded(self) -> None:
+        """Hand every finished load to the `on_loaded` callback.
+
+        Failed loads are printed and scheduled for a retry,
+        leaving the players loading in the meantime.
+        Loads of players who are no longer being loaded are dropped.
+        Also resubmits the retries which are due.
+        """
+        while True:
+            try:
+                player, fetch, failures, future = self._loaded.get_nowait()
+            except Empty:
+                break
+            if self._loading.get(player.index) is not player:
+                continue
+            error = future.exception()
+            if error is None:
+                del self._loading[player.index]
+                self._on_loaded(player, future.result())
+                continue
+            print(f"Unable to load data for player '{player.steamid}', retrying")
+            print_exception(type(error), error, error.__traceback__)
+            delay = min(self.retry_delay * 2 ** failures, self.max_retry_delay)
+            self._retries[player.index] = (player, fetch, failures + 1, self.clock() + delay)
+
+        if self._retries:
+            now = self.clock()
+            for index, (player, fetch, failures, time) in list(self._retries.items()):
+                if time <= now:
+                    del self._retries[index]
+                    self._submit(player, fetch, failures)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, abandoning any unfinished loads."""
+        self._loading.clear()
+        self._retries.clear()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,70 @@
+# Python imports
+from threading import Event, Thread
+from traceback import print_exc
+from typing import Callable, Optional
+
+
+class BackgroundMigration:
+    """Run a batched data migration on a background thread.
+
+    The `step` callback migrates one batch and returns whether
+    there's anything left to migrate. Batches are separated by
+    `delay` seconds to keep the database available for the game,
+    and failed batches are retried after `retry_delay` seconds.
+    The optional `prepare` callback is called once before the batches,
+    and the migration is abandoned if it returns `False`.
+
+    Stopping only abandons the migration between batches,
+    so the `step` callback should checkpoint its progress
+    to resume from when the migration is started again.
+    """
+
+    def __init__(self,
+        step: Callable[[], bool],
+        *,
+        prepare: Optional[Callable[[], Optional[bool]]]=None,
+        delay: float=0.5,
+        retry_delay: float=5.0,
+    ) -> None:
+        self._step = step
+        self._prepare = prepare
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self._stopped = Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the migration thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start migrating on the background thread."""
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name='rpg-migration', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float]=None) -> None:
+        """Stop migrating after the current batch."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        if self._prepare is not None:
+            try:
+                if self._prepare() is False:
+                    return
+            except Exception:
+                print_exc()
+        while not self._stopped.is_set():
+            try:
+                if not self._step():
+                    return
+            except Exception:
+                print_exc()
+                self._stopped.wait(self.retry_delay)
+                continue
+            self._stopped.wait(self.delay)
@@ -0,0 +1,370 @@
+# Python imports
+from threading import Condition, Thread
+from traceback import print_exc
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# RPG imports
+from .player import Player
+
+
+class PlayerData(NamedTuple):
+    """A player's data as stored in the database.
+
+    The `db_id` is the player's row ID, and the `skills` dict
+    maps each skill's key to a `(db_id, level)` tuple,
+    where the `db_id` is the ID of the skill's key.
+    """
+    db_id: int
+    level: int
+    xp: int
+    credits: int
+    skills: Dict[str, Tuple[int, int]]
+
+
+def apply_player_data(player: Player, data: PlayerData) -> None:
+    """Overwrite a player's progress with data from the database.
+
+    Leaves the player and their skills without unsaved changes.
+    """
+    player._db_id = data.db_id
+    player._level = data.level
+    player._xp = data.xp
+    player._credits = data.credits
+    player._dirty = False
+    player._saved = (data.level, data.xp, data.credits)
+    for skill in player.skills:
+        if skill.key in data.skills:
+            skill._db_id, skill.level = data.skills[skill.key]
+        skill._dirty = False
+        skill._saved_level = skill.level
+    player.rebuild_skill_index()
+
+
+def copy_player_data(player: Player) -> Optional[PlayerData]:
+    """Copy a player's current progress, the counterpart of `apply_player_data()`.
+
+    Returns `None` for players whose data is still loading,
+    or who don't exist in the database.
+    Should be called after the player's changes have been
+    snapshotted, so the copy has no unsaved changes either.
+    """
+    if player.loading or player._db_id is None:
+        return None
+    return PlayerData(
+        player._db_id,
+        player.level,
+        player.xp,
+        player.credits,
+        {skill.key: (skill._db_id, skill.level) for skill in player.skills if skill._db_id is not None},
+    )
+
+
+class PlayerSnapshot(NamedTuple):
+    """Immutable copy of a player's unsaved data.
+
+    Snapshots are taken on the game thread so that the writer thread
+    never has to touch the actual player or skill objects.
+
+    Along with the new values, each snapshot carries the `base`
+    `(level, xp, credits)` it was changed from, i.e. the values
+    of the previous snapshot or load, so that the changes can be
+    merged with other servers's changes made in the meantime.
+    The `skills` dict maps each changed skill's `_db_id`
+    to a `(base_level, level)` tuple for the same purpose.
+    """
+    steamid: str
+    db_id: int
+    name: str
+    level: int
+    xp: int
+    credits: int
+    base: Tuple[int, int, int]
+    skills: Dict[int, Tuple[int, int]]
+
+    def merge(self, newer: 'PlayerSnapshot') -> 'PlayerSnapshot':
+        """Merge a newer snapshot of the same player on top of this one.
+
+        The merged snapshot keeps this snapshot's base values,
+        so it contains the changes of both snapshots.
+        """
+        skills = dict(self.skills)
+        for skill_id, (base_level, level) in newer.skills.items():
+            if skill_id in skills:
+                base_level = skills[skill_id][0]
+            skills[skill_id] = (base_level, level)
+        return newer._replace(base=self.base, skills=skills)
+
+
+def take_snapshot(player: Player, *, force: bool=False) -> Optional[PlayerSnapshot]:
+    """Take a snapshot of a player's changed data.
+
+    Returns `None` if nothing has changed since the last snapshot,
+    unless `force` is set, in which case every skill is included.
+    Clears the dirty flags of the player and their skills.
+
+    Players whose data is still loading, or who don't exist
+    in the database yet, are never snapshotted, as saving them
+    would overwrite their actual progress.
+    """
+    if player.loading or player._db_id is None:
+        return None
+    if not force and not player.dirty:
+        return None
+    skills = {}
+    for skill in player.skills:
+        if (force or skill._dirty) and skill._db_id is not None:
+            skills[skill._db_id] = (skill._saved_level, skill.level)
+            skill._saved_level = skill.level
+        skill._dirty = False
+    base, player._saved = player._saved, (player.level, player.xp, player.credits)
+    player._dirty = False
+    return PlayerSnapshot(
+        player.steamid,
+        player._db_id,
+        player.name,
+        player.level,
+        player.xp,
+        player.credits,
+        base,
+        skills,
+    )
+
+
+SaveCallback = Callable[[List[PlayerSnapshot]], None]
+SavedCallback = Callable[[], None]
+
+
+class SaveQueue:
+    """Write-behind queue for saving players on a background thread.
+
+    Players are snapshotted on the game thread with `put()`,
+    and a writer thread saves the pending snapshots in batches
+    using the `save` callback, which should save them all
+    in a single transaction.
+    Multiple snapshots of the same player are merged together
+    so that only the latest data gets written.
+
+    When a batch fails, its snapshots are saved one by one,
+    and the failed ones are kept in the queue and retried
+    after `retry_delay` seconds.
+    A snapshot which fails `max_attempts` times in a row
+    while other snapshots still get saved is parked so that
+    it can't hold up the others. A parked snapshot is
+    retried once more whenever the player is queued again,
+    and the parked snapshots are printed when the queue is stopped.
+
+    An `on_saved` callback passed to `put_all()` is called
+    on the writer thread once the batch has been written.
+    If some of the batch's snapshots got parked, the callback
+    is held until those players have been saved after all,
+    so it's never called for changes that only live in memory.
+    """
+
+    def __init__(self, save: SaveCallback, *, retry_delay: float=5.0, max_attempts: int=3) -> None:
+        self._save = save
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._pending: Dict[str, PlayerSnapshot] = {}
+        self._parked: Dict[str, PlayerSnapshot] = {}
+        self._failures: Dict[str, Tuple[int, int]] = {}  # steamid: (counted failed attempts, saves before the first)
+        self._saved = 0  # Amount of snapshots saved
+        self._on_saved: List[SavedCallback] = []
+        self._held: List[Tuple[Set[str], List[SavedCallback]]] = []  # (parked steamids, callbacks)
+        self._writing = False
+        self._running = False
+        self._condition = Condition()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is running."""
+        return self._running
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, name='rpg-save-queue', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float]=None) -> bool:
+        """Flush the pending saves and stop the writer thread.
+
+        Waits at most `timeout` seconds for the flush to finish.
+        Returns whether every pending save was written.
+        """
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+            parked = list(self._parked)
+        if parked:
+            print(f"Unable to save {len(parked)} players: {', '.join(parked)}")
+        return flushed and not parked
+
+    def put(self, player: Player, *, force: bool=False) -> bool:
+        """Queue a player's changed data for saving.
+
+        Returns `False` if the player had no changes to save.
+        """
+        snapshot = take_snapshot(player, force=force)
+        if snapshot is None:
+            return False
+        self.put_snapshot(snapshot)
+        return True
+
+    def put_all(self,
+        players: Iterable[Player],
+        *,
+        on_saved: Optional[SavedCallback]=None,
+    ) -> int:
+        """Queue every changed player for saving in one batch.
+
+        The `on_saved` callback is called once these players,
+        and everything queued before them, have been written,
+        including any of them that get parked.
+        Returns the amount of players queued.
+        """
+        snapshots = [take_snapshot(player) for player in players]
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+        with self._condition:
+            for snapshot in snapshots:
+                self._add(snapshot)
+            if on_saved is not None:
+                self._on_saved.append(on_saved)
+            self._condition.notify_all()
+        return len(snapshots)
+
+    def put_snapshot(self, snapshot: PlayerSnapshot) -> None:
+        """Queue an existing snapshot for saving."""
+        with self._condition:
+            self._add(snapshot)
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float]=None) -> bool:
+        """Wait for the pending saves to be written.
+
+        Returns `False` if the `timeout` expired before that.
+        """
+        with self._condition:
+            if not self._running:
+                return not self._pending and not self._on_saved
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._on_saved and not self._writing,
+                timeout,
+            )
+
+    @property
+    def parked(self) -> List[PlayerSnapshot]:
+        """Snapshots which kept failing to save, and are no longer retried."""
+        with self._condition:
+            return list(self._parked.values())
+
+    def _add(self, snapshot: PlayerSnapshot) -> None:
+        """Add a snapshot to the pending saves. Must hold the lock."""
+        parked = self._parked.pop(snapshot.steamid, None)
+        if parked is not None:
+            snapshot = parked.merge(snapshot)
+        older = self._pending.get(snapshot.steamid)
+        self._pending[snapshot.steamid] = snapshot if older is None else older.merge(snapshot)
+
+    def _run(self) -> None:
+        """Save pending snapshots until the queue is stopped."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._on_saved or not self._running)
+                if not self._pending and not self._on_saved:
+                    return
+                batch, self._pending = self._pending, {}
+                on_saved, self._on_saved = self._on_saved, []
+                self._writing = True
+
+            failed, parked = self._write(batch)
+
+            callbacks = self._release(batch.keys() - failed.keys() - parked)
+            if parked:
+                self._held.append((parked | failed.keys(), on_saved))
+                on_saved = []
+            elif not failed:
+                callbacks[:0] = on_saved
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception:
+                    print_exc()
+
+            with self._condition:
+                self._writing = False
+                if failed:
+                    for steamid, snapshot in failed.items():
+                        newer = self._pending.get(steamid)
+                        self._pending[steamid] = snapshot if newer is None else snapshot.merge(newer)
+                    self._on_saved[:0] = on_saved
+                self._condition.notify_all()
+                if failed:
+                    if not self._running:
+                        return
+                    self._condition.wait(self.retry_delay)
+
+    def _release(self, saved: Iterable[str]) -> List[SavedCallback]:
+        """Get the held callbacks whose parked players have now all been saved."""
+        if not self._held:
+            return []
+        saved = set(saved)
+        released = []
+        for parked, callbacks in self._held:
+            parked -= saved
+            if not parked:
+                released.extend(callbacks)
+        self._held = [(parked, callbacks) for parked, callbacks in self._held if parked]
+        return released
+
+    def _write(self, batch: Dict[str, PlayerSnapshot]) -> Tuple[Dict[str, PlayerSnapshot], Set[str]]:
+        """Save a batch, falling back to saving each snapshot separately.
+
+        Failed attempts are only counted once other snapshots have been
+        saved since the snapshot first failed, since otherwise the database
+        itself is likely failing instead of the snapshot.
+        Snapshots with `max_attempts` counted attempts are parked.
+        Returns the failed snapshots which should be retried,
+        and the steamids of the parked snapshots.
+        """
+        if not batch:
+            return {}, set()
+        saved = self._saved
+        if len(batch) > 1:
+            try:
+                self._save(list(batch.values()))
+            except Exception:
+                print(f'Unable to save a batch of {len(batch)} players, saving them one by one')
+                print_exc()
+            else:
+                self._saved += len(batch)
+                for steamid in batch:
+                    self._failures.pop(steamid, None)
+                return {}, set()
+
+        failed = {}
+        for steamid, snapshot in batch.items():
+            try:
+                self._save([snapshot])
+            except Exception as error:
+                print(f"Unable to save player '{steamid}': {error!r}")
+                failed[steamid] = snapshot
+            else:
+                self._saved += 1
+                self._failures.pop(steamid, None)
+
+        parked = set()
+        for steamid in list(failed):
+            failures, saved_before = self._failures.get(steamid, (0, saved))
+            if self._saved > saved_before:
+                failures += 1
+            self._failures[steamid] = (failures, saved_before)
+            if failures >= self.max_attempts:
+                with self._condition:
+                    self._parked[steamid] = failed.pop(steamid)
+                parked.add(steamid)
+                print(f"Unable to save player '{steamid}' after {failures} attempts, parking their changes")
+        return failed, parked
@@ -1,14 +1,18 @@
 # Python imports
 from collections import OrderedDict
-from typing import Any, Dict, Iterable, Optional
+from random import choices
+from typing import Any, Callable, Dict, Iterable, Optional
 
 # Custom package imports
 import easyplayer
 
 # RPG imports
-from .config import REQUIRED_XP
+from .config import LOADING_BUFFER_SIZE, REQUIRED_XP
+from .journal import Journal
+from .leaderboard import Leaderboard
 from .listeners import OnPlayerDowngradeSkill, OnPlayerLevelUp, OnPlayerUpgradeSkill
 from .skill import Skill
+from .utils import xp_to_levels
 
 
 class Player(easyplayer.Player):
@@ -18,9 +22,22 @@ class Player(easyplayer.Player):
     Leveling up grants `credits`, which can be spent
     to upgrade the player's skills to give them bonus powers.
 
+    While the player's data is being loaded in the background,
+    XP gains and skill events are buffered and replayed
+    in their original order once the loading has finished.
+
+    Every progression change of a `persistent` player is also
+    recorded into the class's `journal`, if one has been set,
+    to survive crashes between saves, and into the class's
+    `leaderboard`, if one has been set.
+    Bots aren't persistent, their progress only lives in memory.
+
     Subclasses `easyplayer.Player` for its player effects.
     """
 
+    journal: Optional[Journal] = None
+    leaderboard: Optional[Leaderboard] = None
+
     def __init__(self,
         index: int,
         *,
@@ -31,8 +48,14 @@ class Player(easyplayer.Player):
         super().__init__(index)
         self._level = level
         self._xp = xp
-        self.credits = credits
+        self._credits = credits
         self._skills = OrderedDict()
+        self._event_index = {}
+        self._dirty = False
+        self._deferred = None
+        self._db_id = None
+        self._saved = (level, xp, credits)
+        self.persistent = self.steamid != 'BOT'
 
     def add_skill(self, skill: Skill) -> None:
         """Add a skill for the player.
@@ -40,6 +63,8 @@ class Player(easyplayer.Player):
         Calls the skill's `init_callback`, if any.
         """
         self._skills[skill.key] = skill
+        if skill.level > 0:
+            self._index_skill(skill)
         if skill._init_callback is not None:
             skill._init_callback(player=self, skill=skill)
 
@@ -52,6 +77,72 @@ class Player(easyplayer.Player):
         """Iterate the player's skills."""
         return iter(self._skills.values())
 
+    def _index_skill(self, skill: Skill) -> None:
+        """Update the event index for each event the skill subscribes to.
+
+        The index maps event names to `(skill, callback)` pairs
+        of the player's leveled skills, in the skills's order.
+        Entries are immutable tuples, so callbacks may safely
+        change skill levels while the event is being dispatched.
+        """
+        for event_name in skill._event_callbacks:
+            subscribers = tuple(
+                (other, other._event_callbacks[event_name])
+                for other in self.skills
+                if other.level > 0 and event_name in other._event_callbacks
+            )
+            if subscribers:
+                self._event_index[event_name] = subscribers
+            else:
+                self._event_index.pop(event_name, None)
+
+    def rebuild_skill_index(self) -> None:
+        """Rebuild the whole event index from the skills's levels.
+
+        Must be called after setting skill levels directly,
+        without going through the player's methods.
+        """
+        self._event_index.clear()
+        for skill in self.skills:
+            if skill.level > 0:
+                self._index_skill(skill)
+
+    def subscribes_to(self, event_name: str) -> bool:
+        """Check if any of the player's leveled skills handle an event.
+
+        Always true while loading, so that the event gets buffered.
+        """
+        return self._deferred is not None or event_name in self._event_index
+
+    @property
+    def loading(self) -> bool:
+        """Whether the player's data is still being loaded."""
+        return self._deferred is not None
+
+    def begin_loading(self) -> None:
+        """Put the player into the provisional loading state."""
+        if self._deferred is None:
+            self._deferred = []
+
+    def finish_loading(self) -> None:
+        """Leave the loading state and replay the buffered actions."""
+        deferred, self._deferred = self._deferred, None
+        for method, args, kwargs in deferred or ():
+            method(self, *args, **kwargs)
+
+    def _defer(self, method: Callable, *args: Any, **kwargs: Any) -> None:
+        """Buffer a method call until the player has finished loading.
+
+        Consecutive XP gains are merged into one, and they are never dropped.
+        Once the buffer is full, any other calls are dropped.
+        """
+        if method is Player.give_xp:
+            if self._deferred and self._deferred[-1][0] is method:
+                args = (self._deferred.pop()[1][0] + args[0],)
+            self._deferred.append((method, args, kwargs))
+        elif len(self._deferred) < LOADING_BUFFER_SIZE:
+            self._deferred.append((method, args, kwargs))
+
     @property
     def level(self) -> int:
         """Player's current level."""
@@ -62,6 +153,21 @@ class Player(easyplayer.Player):
         """Player's current XP progress."""
         return self._xp
 
+    @property
+    def credits(self) -> int:
+        """Player's credits for upgrading skills."""
+        return self._credits
+
+    @credits.setter
+    def credits(self, value: int) -> None:
+        self._credits = value
+        self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the player or any of their skills have unsaved changes."""
+        return self._dirty or any(skill._dirty for skill in self.skills)
+
     @property
     def required_xp(self) -> int:
         """XP required to reach the next level."""
@@ -74,21 +180,37 @@ class Player(easyplayer.Player):
         """
         if amount < 0:
             raise ValueError(f"Negative amount '{amount}' passed for Player.give_xp()")
+        if self._deferred is not None:
+            return self._defer(Player.give_xp, amount)
 
-        initial_level, initial_credits = self.level, self.credits
+        levels, self._xp = xp_to_levels(
+            self._xp + amount,
+            self._level,
+            REQUIRED_XP['base'],
+            REQUIRED_XP['per_level'],
+        )
+        self._dirty = True
+        if levels > 0:
+            self._level += levels
+            self._credits += levels * 5
+        self._record_progress()
 
-        self._xp += amount
-        while self.xp >= self.required_xp:
-            self._xp -= self.required_xp
-            self._level += 1
-            self.credits += 5
+        if levels > 0:
+            OnPlayerLevelUp.manager.notify(player=self, levels=levels, credits=levels * 5)
 
-        if initial_level < self.level:
-            OnPlayerLevelUp.manager.notify(
-                player=self,
-                levels=initial_level - self.level,
-                credits=initial_credits - self.credits,
-            )
+    def give_xp_bulk(self, amounts: Iterable[int]) -> None:
+        """Give many XP awards to the player at once.
+
+        Levels the player up only once with the combined amount,
+        so `OnPlayerLevelUp` is notified at most once with the totals.
+        """
+        total = 0
+        for amount in amounts:
+            if amount < 0:
+                raise ValueError(f"Negative amount '{amount}' passed for Player.give_xp_bulk()")
+            total += amount
+        if total > 0:
+            self.give_xp(total)
 
     def set_level(self, value: int) -> None:
         """Set a player's level.
@@ -99,6 +221,8 @@ class Player(easyplayer.Player):
             raise ValueError(f"Negative value '{value}' passed for Player.set_level()")
         self._level = value
         self._xp = 0
+        self._dirty = True
+        self._record_progress()
 
     def reset_rpg_progress(self) -> None:
         """Completely reset player's RPG progress.
@@ -108,8 +232,26 @@ class Player(easyplayer.Player):
         self._level = 0
         self._xp = 0
         self.credits = 0
+        self._record_progress()
         for skill in self.skills:
             skill.level = 0
+            skill._dirty = True
+            self._record_skill(skill)
+        self._event_index.clear()
+
+    def _record_progress(self) -> None:
+        """Record the player's level, XP, and credits into the journal and leaderboard."""
+        if not self.persistent:
+            return
+        if self.journal is not None:
+            self.journal.record_player(self.steamid, self._level, self._xp, self._credits, self._saved)
+        if self.leaderboard is not None:
+            self.leaderboard.update(self.steamid, self._level, self._xp)
+
+    def _record_skill(self, skill: Skill) -> None:
+        """Record a skill's level into the journal."""
+        if self.journal is not None and self.persistent:
+            self.journal.record_skill(self.steamid, skill.key, skill.level, skill._saved_level)
 
     def can_upgrade_skill(self, skill: Skill) -> bool:
         """Check if a player can upgrade his skill.
@@ -137,6 +279,11 @@ class Player(easyplayer.Player):
             raise RuntimeError(f"Unable to upgrade {self.name}'s skill '{skill.name}'")
         self.credits -= skill.upgrade_cost
         skill.level += 1
+        skill._dirty = True
+        if skill.level == 1:
+            self._index_skill(skill)
+        self._record_progress()
+        self._record_skill(skill)
         OnPlayerUpgradeSkill.manager.notify(player=self, skill=skill)
 
     def downgrade_skill(self, skill: Skill) -> None:
@@ -148,14 +295,62 @@ class Player(easyplayer.Player):
             raise RuntimeError(f"Unable to downgrade {self.name}'s skill '{skill.name}'")
         self.credits += skill.downgrade_refund
         skill.level -= 1
+        skill._dirty = True
+        if skill.level == 0:
+            self._index_skill(skill)
+        self._record_progress()
+        self._record_skill(skill)
         OnPlayerDowngradeSkill.manager.notify(player=self, skill=skill)
 
+    def allocate_credits(self, weights: Dict[str, float], default_weight: float=1.0) -> int:
+        """Spend all of the player's credits on random skill upgrades.
+
+        Each upgrade picks a skill at random, weighted by the skill's
+        key in `weights`, or by `default_weight` for other skills.
+        Skills with zero weight are never upgraded.
+        Since the credits only go down and the costs only go up,
+        a skill that can't be upgraded is dropped from the pool
+        for the rest of the allocation.
+        Returns the amount of upgrades made.
+        """
+        pool = []
+        pool_weights = []
+        for skill in self.skills:
+            weight = weights.get(skill.key, default_weight)
+            if weight > 0:
+                pool.append(skill)
+                pool_weights.append(weight)
+
+        upgrades = 0
+        while pool:
+            i = choices(range(len(pool)), pool_weights)[0]
+            if self.can_upgrade_skill(pool[i]):
+                self.upgrade_skill(pool[i])
+                upgrades += 1
+            else:
+                del pool[i]
+                del pool_weights[i]
+        return upgrades
+
     def trigger_skills(self, event_name: str, **event_args: Dict[str, Any]) -> None:
         """Trigger each skill with matching event name.
 
-        Ensures the skill has been leveled before trigger it.
+        Only the leveled skills subscribing to the event are triggered,
+        as looked up from the player's event index.
         """
-        for skill in self.skills:
-            if skill.level > 0:
-                event_args['player'] = self
-                skill.trigger(event_name, **event_args)
+        if self._deferred is not None:
+            return self._defer(Player.trigger_skills, event_name, **event_args)
+        subscribers = self._event_index.get(event_name)
+        if subscribers is None:
+            return
+        event_args['player'] = self
+        for skill, callback in subscribers:
+            event_args['skill'] = skill
+            level_values = skill._level_values
+            level = skill.level
+            callback(
+                strings=skill._lang_strings,
+                variables=skill._variables,
+                values=level_values[level] if level < len(level_values) else level_values[-1],
+                **event_args,
+            )
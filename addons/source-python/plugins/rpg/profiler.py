@@ -0,0 +1,103 @@
+# Python imports
+from time import perf_counter
+from typing import Dict, Iterable, List, Tuple
+
+# RPG imports
+from .skill import EventCallback, SkillType
+
+
+class CallStats:
+    """Call count and wall times of a single skill callback."""
+    __slots__ = ('calls', 'total_time', 'max_time')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+StatsKey = Tuple[str, str]  # (skill key, event name)
+
+
+class SkillProfiler:
+    """Profiler for skills's event callbacks.
+
+    When started, the event callbacks (and init callbacks) of the given
+    skill types are replaced with timing wrappers, and the original
+    callbacks are restored when stopped, so there's no overhead at all
+    while the profiler isn't running.
+    Since skills copy their callbacks from their type objects,
+    the skills must be refreshed after starting or stopping.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[StatsKey, CallStats] = {}
+        self._originals: Dict[str, Tuple[SkillType, Dict[str, EventCallback], EventCallback]] = {}
+
+    @property
+    def running(self) -> bool:
+        """Whether the profiler is currently instrumenting any skills."""
+        return bool(self._originals)
+
+    def start(self, skill_types: Iterable[SkillType]) -> None:
+        """Start profiling the callbacks of skill types."""
+        for skill_type in skill_types:
+            if skill_type.key in self._originals:
+                continue
+            self._originals[skill_type.key] = (
+                skill_type,
+                skill_type.event_callbacks,
+                skill_type.init_callback,
+            )
+            skill_type.event_callbacks = {
+                event_name: self._wrap(skill_type.key, event_name, callback)
+                for event_name, callback in skill_type.event_callbacks.items()
+            }
+            if skill_type.init_callback is not None:
+                skill_type.init_callback = self._wrap(skill_type.key, 'init', skill_type.init_callback)
+
+    def stop(self) -> None:
+        """Stop profiling and restore the original callbacks."""
+        for skill_type, event_callbacks, init_callback in self._originals.values():
+            skill_type.event_callbacks = event_callbacks
+            skill_type.init_callback = init_callback
+        self._originals.clear()
+
+    def reset(self) -> None:
+        """Clear the recorded statistics."""
+        self.stats.clear()
+
+    def _wrap(self, key: str, event_name: str, callback: EventCallback) -> EventCallback:
+        """Wrap a callback to record its statistics."""
+        stats = self.stats.setdefault((key, event_name), CallStats())
+
+        def profiled_callback(**event_args):
+            start = perf_counter()
+            try:
+                return callback(**event_args)
+            finally:
+                elapsed = perf_counter() - start
+                stats.calls += 1
+                stats.total_time += elapsed
+                if elapsed > stats.max_time:
+                    stats.max_time = elapsed
+
+        profiled_callback.__wrapped__ = callback
+        return profiled_callback
+
+    def report(self) -> List[str]:
+        """Format the statistics into lines, slowest callbacks first."""
+        lines = [f"{'skill':<20} {'event':<24} {'calls':>8} {'total ms':>10} {'avg us':>9} {'max us':>9}"]
+        ordered = sorted(self.stats.items(), key=lambda item: item[1].total_time, reverse=True)
+        for (key, event_name), stats in ordered:
+            if not stats.calls:
+                continue
+            lines.append(
+                f'{key:<20} {event_name:<24} {stats.calls:>8} {stats.total_time * 1e3:>10.2f}'
+                f' {stats.average_time * 1e6:>9.1f} {stats.max_time * 1e6:>9.1f}'
+            )
+        return lines
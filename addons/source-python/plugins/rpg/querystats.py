@@ -0,0 +1,204 @@
+# Python imports
+import logging
+import re
+from bisect import bisect_left
+from functools import wraps
+from inspect import isgeneratorfunction
+from logging.handlers import RotatingFileHandler
+from threading import Lock, local
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+# Site-Package imports
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+F = TypeVar('F', bound=Callable)
+
+# Upper bounds of the histogram buckets in seconds, four per doubling from 10 us to over a minute
+_BUCKET_BOUNDS = [1e-5 * 2 ** (i / 4) for i in range(92)]
+
+# First table named in a statement, like `FROM player`
+_STATEMENT_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE|ON)\s+"?(\w+)', re.IGNORECASE)
+
+# Maximum amount of distinct statements to cache the labels of
+_MAX_LABELS = 1024
+
+
+class LatencyHistogram:
+    """Statement latencies counted into fixed logarithmic buckets.
+
+    Uses a constant amount of memory no matter how many statements
+    are recorded, and the percentiles are accurate to about 20 %.
+    """
+    __slots__ = ('counts', 'calls', 'rows', 'total_time', 'max_time')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.calls = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def add(self, elapsed: float, rows: int) -> None:
+        self.counts[bisect_left(_BUCKET_BOUNDS, elapsed)] += 1
+        self.calls += 1
+        self.rows += max(rows, 0)
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    def percentile(self, fraction: float) -> float:
+        """Get the upper bound of the bucket containing the percentile, in seconds."""
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                if index < len(_BUCKET_BOUNDS):
+                    return min(_BUCKET_BOUNDS[index], self.max_time)
+                return self.max_time
+        return 0.0
+
+
+StatsKey = Tuple[str, str]  # (operation, statement)
+
+
+class QueryStats:
+    """Latency statistics of an engine's statements, grouped by operation.
+
+    When attached to an engine, every executed statement's latency
+    and the amount of rows it changed are recorded into a histogram
+    of the database operation that executed it, like `save_snapshots`.
+    The operations are marked with the `operation` decorator,
+    and statements outside of any operation are grouped under `-`.
+
+    Statements taking longer than `slow_threshold` seconds are written
+    into the `slow_log` file, which is rotated once it gets too big.
+    """
+
+    def __init__(self,
+        *,
+        slow_threshold: Optional[float]=None,
+        slow_log: Optional[str]=None,
+        slow_log_size: int=1_000_000,
+        slow_log_backups: int=3,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.stats: Dict[StatsKey, LatencyHistogram] = {}
+        self._lock = Lock()
+        self._local = local()
+        self._labels: Dict[str, str] = {}
+        self._slow_logger: Optional[logging.Logger] = None
+        if slow_log is not None and slow_threshold is not None:
+            handler = RotatingFileHandler(
+                slow_log, maxBytes=slow_log_size, backupCount=slow_log_backups, delay=True, encoding='utf-8',
+            )
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self._slow_logger = logging.getLogger(f'rpg.querystats.{id(self)}')
+            self._slow_logger.propagate = False
+            self._slow_logger.addHandler(handler)
+            self._slow_logger.setLevel(logging.INFO)
+
+    def attach(self, engine: Engine) -> None:
+        """Start recording the engine's statements."""
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def operation(self, func: F) -> F:
+        """Decorate a function to mark the statements it executes as its operation.
+
+        Nested operations are recorded under the outermost one.
+        """
+        name = func.__name__
+        thread = self._local
+
+        if isgeneratorfunction(func):
+            @wraps(func)
+            def traced_generator(*args, **kwargs):
+                iterator = func(*args, **kwargs)
+                while True:
+                    outer = getattr(thread, 'operation', None)
+                    thread.operation = outer or name
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        thread.operation = outer
+                    yield item
+            return traced_generator
+
+        @wraps(func)
+        def traced(*args, **kwargs):
+            outer = getattr(thread, 'operation', None)
+            if outer is not None:
+                return func(*args, **kwargs)
+            thread.operation = name
+            try:
+                return func(*args, **kwargs)
+            finally:
+                thread.operation = None
+        return traced
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault('rpg_query_start', []).append(perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = perf_counter() - conn.info['rpg_query_start'].pop()
+        operation = getattr(self._local, 'operation', None) or '-'
+        label = self._labels.get(statement)
+        if label is None:
+            label = _label(statement)
+            if len(self._labels) < _MAX_LABELS:
+                self._labels[statement] = label
+        rows = cursor.rowcount
+        with self._lock:
+            histogram = self.stats.get((operation, label))
+            if histogram is None:
+                histogram = self.stats[operation, label] = LatencyHistogram()
+            histogram.add(elapsed, rows)
+        if self._slow_logger is not None and elapsed >= self.slow_threshold:
+            batch = f' x{len(parameters)}' if executemany else ''
+            self._slow_logger.info(
+                f'{elapsed * 1e3:.1f} ms {operation} rows={rows}{batch}: {" ".join(statement.split())}'
+            )
+
+    def _handle_error(self, context) -> None:
+        if context.connection is not None and context.cursor is not None:
+            starts = context.connection.info.get('rpg_query_start')
+            if starts:
+                starts.pop()
+
+    def reset(self) -> None:
+        """Clear the recorded statistics."""
+        with self._lock:
+            self.stats.clear()
+
+    def report(self) -> List[str]:
+        """Format the statistics into lines, slowest operations first."""
+        lines = [
+            f"{'operation':<24} {'statement':<24} {'calls':>7} {'rows':>8}"
+            f" {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        ]
+        with self._lock:
+            ordered = sorted(self.stats.items(), key=lambda item: item[1].total_time, reverse=True)
+            for (operation, label), histogram in ordered:
+                lines.append(
+                    f'{operation:<24} {label:<24} {histogram.calls:>7} {histogram.rows:>8}'
+                    f' {histogram.percentile(0.5) * 1e3:>8.2f} {histogram.percentile(0.9) * 1e3:>8.2f}'
+                    f' {histogram.percentile(0.99) * 1e3:>8.2f} {histogram.max_time * 1e3:>8.2f}'
+                )
+        return lines
+
+
+def _label(statement: str) -> str:
+    """Get a short label of a statement, like `UPDATE rpg_player`."""
+    words = statement.split(None, 1)
+    if not words:
+        return '-'
+    match = _STATEMENT_TABLE.search(statement)
+    verb = words[0].upper()
+    return verb if match is None else f'{verb} {match.group(1)}'
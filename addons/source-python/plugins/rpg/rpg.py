@@ -1,10 +1,12 @@
 # Python imports
-from typing import Dict
+from typing import Dict, List, Optional
 
 # Source.Python imports
 from commands import CommandReturn
 from commands.client import ClientCommand
 from commands.say import SayCommand
+from commands.server import ServerCommand
+from listeners import OnTick
 from listeners.tick import Repeat
 from events import Event
 from menus import ListMenu
@@ -19,17 +21,29 @@ from players.helpers import index_from_userid
 from translations.strings import LangStrings
 
 # RPG imports
+import rpg.accumulator
 import rpg.builder
 import rpg.config
 import rpg.database
+import rpg.journal
+import rpg.langcache
+import rpg.leaderboard
 import rpg.listeners
+import rpg.loading
+import rpg.migration
+import rpg.persistence
 import rpg.player
+import rpg.profiler
+import rpg.scheduler
+import rpg.sessions
 import rpg.skill
-import rpg.utils
+import rpg.spatial
+import rpg.trace
 
 
 # Translations
 _tr = LangStrings('rpg')
+_translate = rpg.langcache.TranslationCache()
 
 
 # ========================
@@ -42,42 +56,208 @@ def new_player(index: int) -> rpg.player.Player:
     Initializes the player object with instances of each RPG skill.
     Loads the player's data from the database,
     or creates the data if it's a new player.
+    Bots skip the database entirely and always start from scratch.
+
+    Players who have recently disconnected are restored from
+    the `sessions` cache instead of loading them again,
+    unless their last save had to be merged with another server's changes.
+    With `ASYNC_PLAYER_LOADING` the data is loaded on a worker thread,
+    and the player remains in a provisional loading state until then.
     """
     player = rpg.player.Player(index)
     for skill_type in skill_types.values():
         player.add_skill(rpg.skill.Skill(skill_type))
 
-    if not rpg.database.load_player(player):
-        rpg.database.create_player(player)
+    if not player.persistent:
+        return player
+    data = sessions.pop(player.steamid)
+    if data is not None and not data.skills.keys() >= skill_types.keys():
+        data = None
+    if rpg.config.ASYNC_PLAYER_LOADING:
+        player_loader.submit(player, None if data is None else _fetch_session(data))
+    elif data is not None and rpg.database.is_current(data):
+        rpg.persistence.apply_player_data(player, data)
+        _update_leaderboard(player)
+    else:
+        if not rpg.database.load_player(player):
+            rpg.database.create_player(player)
+        _update_leaderboard(player)
 
     return player
 
 
-skill_types: Dict[str, rpg.skill.SkillType] = rpg.builder.build_skill_types(PLUGIN_PATH / 'rpg' / 'skills')
+def _fetch_session(data: rpg.persistence.PlayerData) -> rpg.loading.FetchCallback:
+    """Create a fetch callback for restoring a player from the `sessions` cache.
+
+    The cached data is only used if it's still current according to
+    the player's last save, since the database might be shared
+    with other servers. Otherwise the player is loaded.
+    """
+    def fetch(steamid: str, skill_keys: List[str]) -> rpg.persistence.PlayerData:
+        if rpg.database.is_current(data):
+            return data
+        return rpg.database.fetch_player_data(steamid, skill_keys)
+    return fetch
+
+
+def _on_player_loaded(player: rpg.player.Player, data: rpg.persistence.PlayerData) -> None:
+    """Apply a player's loaded data, unless they've already left."""
+    if players.get(player.index) is not player:
+        return
+    rpg.persistence.apply_player_data(player, data)
+    _update_leaderboard(player)
+    player.finish_loading()
+
+
+def _update_leaderboard(player: rpg.player.Player) -> None:
+    """Update a player's loaded progress and current name into the leaderboard."""
+    if player.persistent:
+        leaderboard.update(player.steamid, player.level, player.xp, player.name)
+
+
+skill_types: Dict[str, rpg.skill.SkillType] = rpg.builder.build_skill_types(
+    PLUGIN_PATH / 'rpg' / 'skills',
+    rpg.config.SKILL_CACHE_PATH,
+)
+sessions = rpg.sessions.SessionCache(rpg.config.SESSION_CACHE_SIZE, rpg.config.SESSION_CACHE_TTL)
 players: Dict[int, rpg.player.Player] = PlayerDictionary(new_player)
+player_loader = rpg.loading.PlayerLoader(
+    rpg.database.fetch_player_data,
+    _on_player_loaded,
+    max_workers=rpg.config.PLAYER_LOADER_WORKERS,
+    retry_delay=rpg.config.PLAYER_LOAD_RETRY_DELAY,
+    max_retry_delay=rpg.config.PLAYER_LOAD_MAX_RETRY_DELAY,
+)
 
 
-def save_all_players():
+xp_accumulator = rpg.accumulator.XPAccumulator(rpg.config.XP_FLUSH_INTERVAL)
+rpg.spatial.positions.source = players.values
+
+
+@OnTick
+def on_tick():
+    """Apply loaded players and leaderboard, give buffered XP, and run the skills's scheduled calls."""
+    rpg.spatial.positions.invalidate()
+    player_loader.process_loaded()
+    leaderboard_loader.process_loaded()
+    xp_accumulator.run()
+    rpg.scheduler.scheduler.run()
+
+
+save_queue = rpg.persistence.SaveQueue(rpg.database.save_snapshots, max_attempts=rpg.config.SAVE_MAX_ATTEMPTS)
+save_queue.start()
+
+
+def _open_journal() -> Optional[rpg.journal.Journal]:
+    """Open the progression journal and replay any leftover segments.
+
+    Leftover segments mean the previous full save never finished,
+    so their changes are written into the database before any
+    player gets loaded.
+    """
+    if rpg.config.JOURNAL_PATH is None:
+        return None
+    journal = rpg.journal.Journal(rpg.config.JOURNAL_PATH)
+    segments = journal.segments()
+    if segments:
+        rpg.database.apply_journal(*journal.read())
+        journal.discard(segments)
+    return journal
+
+
+journal = _open_journal()
+rpg.player.Player.journal = journal
+
+
+leaderboard = rpg.leaderboard.Leaderboard()
+rpg.player.Player.leaderboard = leaderboard
+leaderboard_loader = rpg.leaderboard.LeaderboardLoader(
+    leaderboard,
+    lambda: rpg.database.fetch_leaderboard(rpg.config.LEADERBOARD_PAGE_SIZE),
+)
+leaderboard_loader.start()
+
+
+legacy_migration = rpg.migration.BackgroundMigration(
+    lambda: rpg.database.migrate_legacy_batch(rpg.config.MIGRATION_BATCH_SIZE),
+    prepare=rpg.database.prepare_legacy_migration,
+    delay=rpg.config.MIGRATION_BATCH_DELAY,
+)
+if rpg.database.legacy_migration_pending():
+    legacy_migration.start()
+
+
+def refresh_skills():
+    """Refresh every live skill after their type objects have changed."""
     for player in players.values():
-        rpg.database.save_player(player)
+        for skill in player.skills:
+            skill.refresh()
+        player.rebuild_skill_index()
+
+
+def save_all_players():
+    """Queue every changed player for saving.
+
+    Rotates the journal and discards the rotated segment
+    once the save has finished.
+    """
+    if journal is None:
+        save_queue.put_all(players.values())
+        return
+    segments = journal.rotate()
+    save_queue.put_all(players.values(), on_saved=lambda: journal.discard(segments))
 
 
 def unload():
     _data_save_repeat.stop()
+    rpg.scheduler.scheduler.clear()
+    skill_profiler.stop()
+    event_recorder.stop()
+    player_loader.shutdown()
+    leaderboard_loader.stop()
+    legacy_migration.stop(rpg.config.SAVE_FLUSH_TIMEOUT)
+    xp_accumulator.flush()
     save_all_players()
+    if not save_queue.stop(rpg.config.SAVE_FLUSH_TIMEOUT):
+        print('Unable to save all players before unloading')
+    if journal is not None:
+        _journal_sync_repeat.stop()
+        journal.close()
+        rpg.player.Player.journal = None
+    rpg.player.Player.leaderboard = None
+    sessions.clear()
+    rpg.spatial.positions.source = None
+    rpg.spatial.positions.invalidate()
 
 
 @Event('player_disconnect')
 def save_player_data_on_disconnect(event):
+    """Trigger the player's disconnect callbacks, then save and forget the player.
+
+    The player's data is kept in the `sessions` cache,
+    so they don't have to be loaded again if they come back soon.
+    """
     index = index_from_userid(event['userid'])
     if index not in players:
         return
-    rpg.database.save_player(players[index])
+    player = players[index]
+    trigger_solo_player_callbacks(event)
+    player_loader.discard(player)
+    xp_accumulator.flush_player(player)
+    save_queue.put(player)
+    data = rpg.persistence.copy_player_data(player)
+    if data is not None:
+        sessions.put(player.steamid, data)
     del players[index]
+    rpg.spatial.positions.invalidate()
 
 
 _data_save_repeat = Repeat(save_all_players)
-_data_save_repeat.start(240, 0)
+_data_save_repeat.start(rpg.config.SAVE_INTERVAL, 0)
+
+if journal is not None:
+    _journal_sync_repeat = Repeat(journal.sync)
+    _journal_sync_repeat.start(rpg.config.JOURNAL_SYNC_INTERVAL, 0)
 
 
 # ========================
@@ -88,12 +268,14 @@ def _on_main_menu_build(menu, player_index):
     """Build the main menu."""
     player = players[player_index]
     menu.clear()
-    menu.description = _tr['Credits'].get_string(credits=player.credits)
+    menu.description = _translate(_tr['Credits']).get_string(credits=player.credits)
     menu.extend([
         PagedOption(_tr['Upgrade Skills'], upgrade_skills_menu),
         PagedOption(_tr['Downgrade Skills'], downgrade_skills_menu),
         PagedOption(_tr['Skill Descriptions'], skill_descriptions_menu),
         PagedOption(_tr['Stats'], stats_menu),
+        PagedOption(_tr['Leaderboard'], leaderboard_menu),
+        PagedOption(_tr['Rank'], rank_menu),
     ])
 
 def _on_main_menu_select(menu, player_index, choice):
@@ -111,10 +293,10 @@ def _on_upgrade_skills_menu_build(menu, player_index):
     """Build the upgrade skills menu."""
     player = players[player_index]
     menu.clear()
-    menu.description = _tr['Credits'].get_string(credits=player.credits)
+    menu.description = _translate(_tr['Credits']).get_string(credits=player.credits)
     for skill in player.skills:
-        cost_text = _tr['Cost'].get_string(cost=skill.upgrade_cost)
-        text = f'{skill.name.get_string()} [{skill.level}/{skill.max_level}] ({cost_text})'
+        cost_text = _translate(_tr['Cost']).get_string(cost=skill.upgrade_cost)
+        text = f'{_translate(skill.name).get_string()} [{skill.level}/{skill.max_level}] ({cost_text})'
         can_upgrade = player.can_upgrade_skill(skill)
         menu.append(PagedOption(text, skill, highlight=can_upgrade, selectable=can_upgrade))
 
@@ -136,9 +318,10 @@ def _on_downgrade_skills_menu_build(menu, player_index):
     """Build the downgrade skills menu."""
     player = players[player_index]
     menu.clear()
-    menu.description = _tr['Credits'].get_string(credits=player.credits)
+    menu.description = _translate(_tr['Credits']).get_string(credits=player.credits)
     for skill in player.skills:
-        text = _tr['Skill Text'].get_string(skill=skill, credits=skill.downgrade_refund)
+        refund_text = _translate(_tr['Refund']).get_string(refund=skill.downgrade_refund)
+        text = f'{_translate(skill.name).get_string()} [{skill.level}/{skill.max_level}] ({refund_text})'
         can_downgrade = player.can_downgrade_skill(skill)
         menu.append(PagedOption(text, skill, highlight=can_downgrade, selectable=can_downgrade))
 
@@ -160,9 +343,9 @@ def _on_skill_descriptions_menu_build(menu, player_index):
     """Build the skill descriptions menu."""
     player = players[player_index]
     menu.clear()
-    menu.description = _tr['Credits'].get_string(credits=player.credits)
+    menu.description = _translate(_tr['Credits']).get_string(credits=player.credits)
     menu.extend([
-        ListOption(f'{skill.name.get_string()}\n{skill.description.get_string()}')
+        ListOption(f'{_translate(skill.name).get_string()}\n{_translate(skill.description).get_string()}')
         for skill in player.skills
     ])
 
@@ -178,10 +361,10 @@ def _on_stats_menu_build(menu, player_index):
     """Build the stats menu."""
     player = players[player_index]
     menu.clear()
-    menu.description = _tr['Credits'].get_string(credits=player.credits)
+    menu.description = _translate(_tr['Credits']).get_string(credits=player.credits)
     menu.extend([
-        Text(_tr['Level'].get_string(player=player)),
-        Text(_tr['XP'].get_string(player=player)),
+        Text(_translate(_tr['Level']).get_string(level=player.level)),
+        Text(_translate(_tr['XP']).get_string(xp=player.xp, required_xp=player.required_xp)),
     ])
 
 stats_menu = ListMenu(
@@ -192,21 +375,72 @@ stats_menu = ListMenu(
 )
 
 
+def _leaderboard_text(entry: rpg.leaderboard.LeaderboardEntry) -> Text:
+    return Text(_translate(_tr['Leaderboard Entry']).get_string(entry=entry))
+
+def _rank_description(player: rpg.player.Player) -> str:
+    rank = leaderboard.rank(player.steamid)
+    if rank is None:
+        return _translate(_tr['Unranked']).get_string()
+    return _translate(_tr['Your Rank']).get_string(rank=rank, total=len(leaderboard))
+
+
+def _on_leaderboard_menu_build(menu, player_index):
+    """Build the leaderboard menu."""
+    player = players[player_index]
+    menu.clear()
+    menu.description = _rank_description(player)
+    menu.extend(
+        _leaderboard_text(entry)
+        for entry in leaderboard.top(rpg.config.LEADERBOARD_SIZE)
+    )
+
+leaderboard_menu = ListMenu(
+    title=_tr['Leaderboard'],
+    parent_menu=main_menu,
+    items_per_page=7,
+    build_callback=_on_leaderboard_menu_build,
+)
+
+
+def _on_rank_menu_build(menu, player_index):
+    """Build the rank menu."""
+    player = players[player_index]
+    menu.clear()
+    menu.description = _rank_description(player)
+    menu.extend(
+        _leaderboard_text(entry)
+        for entry in leaderboard.around(player.steamid, rpg.config.LEADERBOARD_RANK_RADIUS)
+    )
+
+rank_menu = ListMenu(
+    title=_tr['Rank'],
+    parent_menu=main_menu,
+    items_per_page=7,
+    build_callback=_on_rank_menu_build,
+)
+
+
 # ========================
 #  Skill triggering
 # ========================
 
-@Event('player_jump', 'player_spawn', 'player_disconnect')
+@Event('player_jump', 'player_spawn')
 def trigger_solo_player_callbacks(event):
     """Trigger skill callbacks for events with only one player.
 
     Also makes sure the player is in a valid team to prevent
     accidental errors with spectators and unassigned players.
+    Disconnects are triggered by `save_player_data_on_disconnect()`
+    before the player is removed.
+    The event is only converted into a dict if any of the
+    player's skills subscribe to it.
     """
-    event_args = event.variables.as_dict()
-    player = players.from_userid(event_args.pop('userid'))
-    if player.team not in (2, 3):
+    player = players.from_userid(event['userid'])
+    if player.team not in (2, 3) or not player.subscribes_to(event.name):
         return
+    event_args = event.variables.as_dict()
+    del event_args['userid']
     player.trigger_skills(event.name, **event_args)
 
 
@@ -216,26 +450,35 @@ _DUO_PLAYER_EVENTS = {
 }
 
 @Event('player_death', 'player_hurt')
-def trigger_duo_player_callbacks(event):
-    """Trigger skill callbacks for events with multiple participants.
+def dispatch_duo_player_event(event):
+    """Dispatch events with multiple participants.
 
+    Resolves the attacker and the victim only once, then triggers
+    their skill callbacks and finally gives XP using the `_XP_RULES`.
     Finds the corresponding attacker and victim event names
-    from the `_DUO_PLAYER_EVENTS` dict.
+    from the `_DUO_PLAYER_EVENTS` dict, and converts the event
+    into a dict only if either player's skills subscribe to them.
     """
-    event_args = event.variables.as_dict()
-    if event['attacker']:
-        attacker = players.from_userid(event_args.pop('attacker'))
-    else:
-        attacker = None
-    victim = players.from_userid(event_args.pop('userid'))
-    event_args.update(attacker=attacker, victim=victim)
+    attacker_userid, victim_userid = event['attacker'], event['userid']
+    attacker = players.from_userid(attacker_userid) if attacker_userid else None
+    victim = players.from_userid(victim_userid)
 
     (attack_event, victim_event, selfvictim_event) = _DUO_PLAYER_EVENTS[event.name]
     if attacker is None:
-        victim.trigger_skills(selfvictim_event, **event_args)
+        triggers = [(victim, selfvictim_event)]
     else:
-        attacker.trigger_skills(attack_event, **event_args)
-        victim.trigger_skills(victim_event, **event_args)
+        triggers = [(attacker, attack_event), (victim, victim_event)]
+    triggers = [(player, name) for (player, name) in triggers if player.subscribes_to(name)]
+
+    if triggers:
+        event_args = event.variables.as_dict()
+        del event_args['userid']
+        event_args.update(attacker=attacker, victim=victim)
+        for player, name in triggers:
+            player.trigger_skills(name, **event_args)
+
+    if attacker is not None and attacker_userid != victim_userid:
+        _XP_RULES[event.name](event, attacker, victim)
 
 
 @rpg.listeners.OnPlayerUpgradeSkill
@@ -265,37 +508,178 @@ def send_rpg_menu(command, player_index, team_only=None):
     return CommandReturn.BLOCK
 
 
-@Event('player_death')
-def give_kill_xp(event):
-    """Give the attacker XP for killing the victim."""
-    if not event['attacker'] or event['attacker'] == event['userid']:
-        return
-    attacker = players.from_userid(event['attacker'])
-    victim = players.from_userid(event['userid'])
+def give_kill_xp(event, attacker, victim):
+    """Give the attacker XP for killing the victim.
+
+    The XP is buffered and given on the next flush of the `xp_accumulator`.
+    """
     xp_on_kill = rpg.config.XP_GAIN['on_kill']
-    attacker.give_xp(xp_on_kill['base'] + victim.level * xp_on_kill['per_level_difference'])
+    xp_accumulator.add(attacker, xp_on_kill['base'] + victim.level * xp_on_kill['per_level_difference'])
 
 
-@Event('player_hurt')
-def give_hurt_xp(event):
-    """Give the attacker XP for hurting the victim."""
-    if not event['attacker'] or event['attacker'] == event['userid']:
-        return
-    attacker = players.from_userid(event['attacker'])
-    attacker.give_xp(int(event['dmg_health'] * rpg.config.XP_GAIN['on_damage']['per_damage']))
+def give_hurt_xp(event, attacker, victim):
+    """Give the attacker XP for hurting the victim.
+
+    The XP is buffered, so a burst of hurt events levels the attacker up only once.
+    """
+    xp_accumulator.add(attacker, int(event['dmg_health'] * rpg.config.XP_GAIN['on_damage']['per_damage']))
 
 
-_level_up_message = SayText2(_tr['Level Up Message'])
+_XP_RULES = {
+    'player_death': give_kill_xp,
+    'player_hurt': give_hurt_xp,
+}
+
 
 @rpg.listeners.OnPlayerLevelUp
 def upgrade_player_skill(player, levels, credits):
-    """Send a level up message to the leveling player."""
-    if player.steamid != 'BOT':
-        _level_up_message.send(player.index, player=player)
+    """Send a level up message to the leveling player.
+
+    Bots spend all of their credits on weighted random upgrades instead.
+    """
+    if player.persistent:
+        message = _translate(_tr['Level Up Message']).get_string(
+            player.language,
+            level=player.level,
+            credits=player.credits,
+        )
+        SayText2(message).send(player.index)
         upgrade_skills_menu.send(player.index)
+    else:
+        player.allocate_credits(rpg.config.BOT_SKILL_WEIGHTS, rpg.config.BOT_DEFAULT_SKILL_WEIGHT)
+
+
+# ========================
+#  Admin commands
+# ========================
+
+skill_profiler = rpg.profiler.SkillProfiler()
 
-    else:  # Force bots to upgrade random skills
-        for skill in rpg.utils.shuffled(player.skills):
-            if player.can_upgrade_skill(skill):
-                player.upgrade_skill(skill)
-                break
+@ServerCommand('rpg_profile')
+def profile_skills(command):
+    """Control the skill callback profiler.
+
+    Usage: `rpg_profile <start|stop|reset|report>`
+    Prints the report when stopped, or when no action is given.
+    """
+    action = command[1] if command.arg_count >= 1 else 'report'
+    if action == 'start':
+        skill_profiler.start(skill_types.values())
+        refresh_skills()
+        print('Skill profiler started')
+    elif action == 'stop':
+        skill_profiler.stop()
+        refresh_skills()
+        print('\n'.join(skill_profiler.report()))
+    elif action == 'reset':
+        skill_profiler.reset()
+    elif action == 'report':
+        print('\n'.join(skill_profiler.report()))
+    else:
+        print('Usage: rpg_profile <start|stop|reset|report>')
+
+
+@ServerCommand('rpg_db_stats')
+def database_stats(command):
+    """Print the latency percentiles of the database's statements.
+
+    Usage: `rpg_db_stats [reset]`
+    The statements are grouped by the `rpg.database` operation executing them.
+    Statements over `DATABASE_SLOW_QUERY_THRESHOLD` are also written into the slow query log.
+    """
+    action = command[1] if command.arg_count >= 1 else 'report'
+    if action == 'reset':
+        rpg.database.query_stats.reset()
+    elif action == 'report':
+        print('\n'.join(rpg.database.query_stats.report()))
+    else:
+        print('Usage: rpg_db_stats [reset]')
+
+
+event_recorder = rpg.trace.EventRecorder()
+
+@Event(*rpg.trace.TRACED_EVENTS)
+def record_event(event):
+    """Record the event if `rpg_trace` is running."""
+    if event_recorder.running:
+        event_recorder.record(event.name, event.variables.as_dict())
+
+
+@ServerCommand('rpg_trace')
+def trace_events(command):
+    """Control the game event recorder.
+
+    Usage: `rpg_trace <start|stop> [path]`
+    The recording can be replayed offline with `benchmarks/replay.py`.
+    """
+    action = command[1] if command.arg_count >= 1 else None
+    if action == 'start':
+        path = command[2] if command.arg_count >= 2 else rpg.config.TRACE_PATH
+        event_recorder.start(path)
+        print(f"Recording events into '{path}'")
+    elif action == 'stop' and event_recorder.running:
+        event_recorder.stop()
+        print(f"Recorded {event_recorder.count} events into '{event_recorder.path}'")
+    else:
+        print('Usage: rpg_trace <start|stop> [path]')
+
+
+def reload_skill(key: str) -> rpg.skill.SkillType:
+    """Rebuild a single skill from its directory and swap it into live players.
+
+    The skill's levels and database rows are left untouched,
+    and the skill's `init_callback` is only called again
+    for the players whose skill needs it.
+    Raises `KeyError` for unknown skills and `ValueError`
+    if the skill's key was changed in its `data.yml`.
+    """
+    old_type = skill_types[key]
+    if old_type.path is None:
+        raise ValueError(f"Skill '{key}' wasn't built from a directory")
+
+    profiling = skill_profiler.running
+    if profiling:
+        skill_profiler.stop()
+    try:
+        new_type = rpg.builder.build_skill(old_type.path, reload=True)
+        if new_type.key != key:
+            raise ValueError(f"Skill '{key}' can't be reloaded with a new key '{new_type.key}'")
+        skill_types[key] = new_type
+        _translate.clear()
+    finally:
+        if profiling:
+            skill_profiler.start(skill_types.values())
+
+    for player in players.values():
+        skill = player.get_skill(key)
+        if skill is None:
+            continue
+        needs_init = skill.replace_type_object(new_type)
+        if profiling:
+            for other in player.skills:
+                other.refresh()
+        player.rebuild_skill_index()
+        if needs_init:
+            skill._init_callback(player=player, skill=skill)
+    return new_type
+
+
+@ServerCommand('rpg_reload_skill')
+def reload_skill_command(command):
+    """Reload a skill into live players without reloading the plugin.
+
+    Usage: `rpg_reload_skill <key>`
+    """
+    if command.arg_count < 1:
+        print('Usage: rpg_reload_skill <key>')
+        return
+    key = command[1]
+    if key not in skill_types:
+        print(f"Unable to find skill for key '{key}'")
+        return
+    try:
+        reload_skill(key)
+    except Exception as error:
+        print(f"Unable to reload skill '{key}': {error!r}")
+    else:
+        print(f"Reloaded skill '{key}'")
@@ -0,0 +1,117 @@
+# Python imports
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic
+from traceback import print_exc
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class ScheduledCall:
+    """Handle to a delayed or repeating call in a `Scheduler`.
+
+    Can be cancelled and rescheduled any number of times.
+    The `args` and `kwargs` may be changed while it's scheduled.
+    """
+    __slots__ = ('callback', 'args', 'kwargs', 'interval', 'time', '_scheduler', '_sequence')
+
+    def __init__(self,
+        scheduler: 'Scheduler',
+        callback: Callable,
+        args: Tuple[Any, ...],
+        kwargs: dict,
+        interval: Optional[float],
+    ) -> None:
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.interval = interval
+        self.time = 0.0
+        self._scheduler = scheduler
+        self._sequence = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the call is waiting to be called."""
+        return self._sequence is not None
+
+    def cancel(self) -> None:
+        """Cancel the call. Does nothing if it isn't running."""
+        self._sequence = None
+
+    def reschedule(self, delay: Optional[float]=None) -> None:
+        """(Re)start the call's countdown from now.
+
+        Defaults to the repeat interval for repeating calls.
+        """
+        if delay is None:
+            delay = self.interval
+        self._scheduler._push(self, self._scheduler.clock() + delay)
+
+
+class Scheduler:
+    """Single heap of delayed and repeating calls.
+
+    Instead of each skill creating their own timers,
+    the calls are stored into one heap which is processed
+    by calling `run()` once per tick, executing all the due calls.
+    Cancelled calls are left in the heap and skipped when popped.
+    """
+
+    def __init__(self, clock: Callable[[], float]=monotonic) -> None:
+        self.clock = clock
+        self._heap: List[Tuple[float, int, ScheduledCall]] = []
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return sum(1 for (_, sequence, call) in self._heap if call._sequence == sequence)
+
+    def delay(self, delay: float, callback: Callable, *args: Any, **kwargs: Any) -> ScheduledCall:
+        """Call a function once after a delay."""
+        call = ScheduledCall(self, callback, args, kwargs, None)
+        self._push(call, self.clock() + delay)
+        return call
+
+    def repeat(self, interval: float, callback: Callable, *args: Any, **kwargs: Any) -> ScheduledCall:
+        """Call a function repeatedly, first one interval from now."""
+        if interval <= 0:
+            raise ValueError(f"Non-positive interval '{interval}' passed for Scheduler.repeat()")
+        call = ScheduledCall(self, callback, args, kwargs, interval)
+        self._push(call, self.clock() + interval)
+        return call
+
+    def _push(self, call: ScheduledCall, time: float) -> None:
+        call.time = time
+        call._sequence = next(self._counter)
+        heappush(self._heap, (time, call._sequence, call))
+
+    def run(self) -> None:
+        """Execute every call that is due.
+
+        Repeating calls which fell behind are not called
+        multiple times to catch up, they just continue from now.
+        """
+        now = self.clock()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, sequence, call = heappop(heap)
+            if call._sequence != sequence:
+                continue  # Cancelled or rescheduled
+            if call.interval is None:
+                call._sequence = None
+            else:
+                next_time = call.time + call.interval
+                self._push(call, next_time if next_time > now else now + call.interval)
+            try:
+                call.callback(*call.args, **call.kwargs)
+            except Exception:
+                print_exc()
+
+    def clear(self) -> None:
+        """Cancel every call."""
+        for _, _, call in self._heap:
+            call._sequence = None
+        self._heap.clear()
+
+
+# Shared scheduler for skills, ran by the plugin on every tick
+scheduler = Scheduler()
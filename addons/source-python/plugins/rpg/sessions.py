@@ -0,0 +1,68 @@
+# Python imports
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Optional, Tuple
+
+# RPG imports
+from .persistence import PlayerData
+
+
+class SessionCache:
+    """LRU cache of recently disconnected players's data.
+
+    Players reconnect on every map change, so their data is kept
+    in memory for `ttl` seconds after they leave, allowing them
+    to be restored with `pop()` without loading them from the database.
+    At most `maxsize` players are kept, dropping the least recently
+    disconnected players first.
+
+    The cache never saves anything, the players must still be saved
+    as usual when they disconnect.
+    """
+
+    def __init__(self,
+        maxsize: int=256,
+        ttl: float=300.0,
+        *,
+        clock: Callable[[], float]=monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions: 'OrderedDict[str, Tuple[float, PlayerData]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def put(self, steamid: str, data: PlayerData) -> None:
+        """Store a disconnected player's data, replacing any older data."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._sessions.pop(steamid, None)
+        self._sessions[steamid] = (self.clock() + self.ttl, data)
+        while len(self._sessions) > self.maxsize:
+            self._sessions.popitem(last=False)
+
+    def pop(self, steamid: str) -> Optional[PlayerData]:
+        """Remove and return a player's data, or `None` if it's missing or expired."""
+        self.expire()
+        entry = self._sessions.pop(steamid, None)
+        return None if entry is None else entry[1]
+
+    def expire(self) -> None:
+        """Drop every expired session.
+
+        The sessions are in the order they were stored in,
+        so only the oldest ones need to be checked.
+        """
+        now = self.clock()
+        sessions = self._sessions
+        while sessions:
+            steamid, (expires, _) = next(iter(sessions.items()))
+            if expires > now:
+                break
+            del sessions[steamid]
+
+    def clear(self) -> None:
+        """Forget every session."""
+        self._sessions.clear()
@@ -1,8 +1,11 @@
 # Python imports
+from collections import namedtuple
+from copy import copy
 from math import inf
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Sequence
 
 # Source.Python imports
+from path import Path
 from translations.strings import LangStrings, TranslationStrings
 
 
@@ -19,7 +22,10 @@ class SkillType:
     - `strings` of type `LangStrings` for the skill's translations
     - `max_level` to limit the skill from being leveled further
     - `init_callback` to initialize a skill for a player
-    - and `event_callbacks` dict to trigger the skill's functionality.
+    - `event_callbacks` dict to trigger the skill's functionality
+    - `state` dict of per-player state fields and their defaults
+    - `values` dict of per-level value tables, indexed by the skill's level
+    - and `path` to the skill's directory, if it was built from one.
 
     Also implements `name` and `description` properties to fetch
     the name and descriptiong language strings automatically.
@@ -33,6 +39,9 @@ class SkillType:
         variables: Optional[Dict[str, Any]]=None,
         init_callback: Optional[EventCallback]=None,
         event_callbacks: Optional[Dict[str, EventCallback]]=None,
+        state: Optional[Dict[str, Any]]=None,
+        values: Optional[Dict[str, Sequence[Any]]]=None,
+        path: Optional[Path]=None,
     ) -> None:
         self.key = key
         self.lang_strings = lang_strings
@@ -40,6 +49,18 @@ class SkillType:
         self.variables = variables if variables is not None else {}
         self.init_callback = init_callback
         self.event_callbacks = event_callbacks if event_callbacks is not None else {}
+        self.state = state if state is not None else {}
+        self.path = path
+        self.state_class = type(f'{key}_state', (SkillState,), {
+            '__slots__': tuple(self.state),
+            '_defaults': self.state,
+        })
+        self.values = values if values is not None else {}
+        self.values_class = namedtuple('SkillValues', tuple(self.values))
+        self.level_values = tuple(
+            self.values_class(*(table[min(level, len(table) - 1)] for table in self.values.values()))
+            for level in range(max(map(len, self.values.values()), default=1))
+        )
 
     @property
     def name(self) -> TranslationStrings:
@@ -52,6 +73,24 @@ class SkillType:
         return self.lang_strings['description']
 
 
+class SkillState:
+    """Base class for a skill's per-player state.
+
+    Each `SkillType` creates a slotted subclass from its `state` dict,
+    so skills can only use the state fields they have declared.
+    """
+    __slots__ = ()
+    _defaults: Dict[str, Any] = {}
+
+    def __init__(self) -> None:
+        for name, default in self._defaults.items():
+            setattr(self, name, copy(default))
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
 def type_object_property(property_name: str) -> property:
     """Property for getting attribute's value from a `type_object`."""
     def fget(self):
@@ -59,23 +98,97 @@ def type_object_property(property_name: str) -> property:
     return property(fget)
 
 
+def _code_of(callback: Optional[EventCallback]) -> Any:
+    """Get the code object of a callback, unwrapping any decorators.
+
+    Returns the callback itself if it's not a plain function.
+    """
+    callback = getattr(callback, '__wrapped__', callback)
+    return getattr(callback, '__code__', callback)
+
+
 class Skill:
     """Skills are used by players to gain special powers.
 
-    Each skill only contains a `type_object` and a `level`,
-    everything else is induced from the type object.
+    Each skill only contains a `type_object`, a `level`,
+    and the skill's per-player `state` declared by the type object.
+    Everything else is induced from the type object, and the
+    attributes needed when triggering the skill are copied from it
+    to avoid looking them up on every event.
+    The `_db_id`, `_dirty`, and `_saved_level` attributes are managed by
+    the database and the player object to keep track of saving.
     """
+    __slots__ = (
+        '_type_object', 'level', 'state', '_db_id', '_dirty', '_saved_level',
+        'key', 'max_level', '_init_callback', '_event_callbacks', '_lang_strings', '_variables',
+        '_level_values',
+    )
 
     def __init__(self, type_object: SkillType, level: int=0) -> None:
         self.type_object = type_object
         self.level = level
+        self.state = type_object.state_class()
+        self._db_id = None
+        self._dirty = False
+        self._saved_level = level
+
+    @property
+    def type_object(self) -> SkillType:
+        """The skill's type object."""
+        return self._type_object
+
+    @type_object.setter
+    def type_object(self, type_object: SkillType) -> None:
+        self._type_object = type_object
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Copy the attributes from the type object again.
+
+        Must be called after modifying the type object.
+        """
+        type_object = self._type_object
+        self.key = type_object.key
+        self.max_level = type_object.max_level
+        self._init_callback = type_object.init_callback
+        self._event_callbacks = type_object.event_callbacks
+        self._lang_strings = type_object.lang_strings
+        self._variables = type_object.variables
+        self._level_values = type_object.level_values
+
+    def replace_type_object(self, type_object: SkillType) -> bool:
+        """Swap the skill's type object in place, keeping the skill's level.
+
+        The skill's state is only recreated if the new type object
+        declares different state fields, and the values of any
+        fields common to both are carried over.
+        Returns whether the skill needs to be initialized again,
+        i.e. if the state or the init callback's code has changed.
+        """
+        old_type_object = self._type_object
+        self.type_object = type_object
+        if type_object.init_callback is None:
+            needs_init = False
+        else:
+            needs_init = _code_of(old_type_object.init_callback) != _code_of(type_object.init_callback)
+
+        if old_type_object.state != type_object.state:
+            state = type_object.state_class()
+            for name in set(old_type_object.state) & set(type_object.state):
+                setattr(state, name, getattr(self.state, name))
+            self.state = state
+            needs_init = needs_init or type_object.init_callback is not None
+        return needs_init
 
-    key: str = type_object_property('key')
     name: TranslationStrings = type_object_property('name')
     description: TranslationStrings = type_object_property('description')
-    max_level: int = type_object_property('max_level')
-    _init_callback: Optional[EventCallback] = type_object_property('init_callback')
-    _event_callbacks: Dict[str, EventCallback] = type_object_property('event_callbacks')
+
+    @property
+    def values(self) -> Any:
+        """The skill's values for its current level."""
+        level_values = self._level_values
+        level = self.level
+        return level_values[level] if level < len(level_values) else level_values[-1]
 
     @property
     def upgrade_cost(self) -> int:
@@ -92,13 +205,7 @@ class Skill:
         
         Does nothing if a callback for the specified event doesn't exist.
         """
-        if event_name not in self._event_callbacks:
-            return
         callback = self._event_callbacks.get(event_name)
         if callback is not None:
             event_args['skill'] = self
-            callback(
-                strings=self.type_object.lang_strings,
-                variables=self.type_object.variables,
-                **event_args
-            )
+            callback(strings=self._lang_strings, variables=self._variables, values=self.values, **event_args)
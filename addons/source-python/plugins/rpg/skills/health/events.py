@@ -1,5 +1,5 @@
-def player_spawn(player, skill, variables, **eargs):
-    player.max_health = 100 + skill.level * variables['health_per_level']
+def player_spawn(player, values, **eargs):
+    player.max_health = values.max_health
     player.health = player.max_health
 
 
@@ -1,6 +1,6 @@
 from players.constants import PlayerButtons
 
 
-def player_attack(player, skill, victim, weapon, variables, **eargs):
+def player_attack(player, victim, weapon, values, **eargs):
     if weapon == 'knife' and player.buttons & PlayerButtons.ATTACK2:
-        victim.freeze(variables['duration_per_level'] * skill.level)
\ No newline at end of file
+        victim.freeze(values.duration)
\ No newline at end of file
@@ -1,19 +1,23 @@
-def init(player, skill):
-    skill._delay = None
+from rpg.scheduler import scheduler
 
 
-def player_victim(player, skill, variables, **eargs):
-    if skill._delay is not None and skill._delay.running:
+def _end_boost(player, amount):
+    player.speed -= amount
+
+
+def player_victim(player, skill, values, **eargs):
+    if skill.state.delay is not None and skill.state.delay.running:
         return  # Limit to one speed boost
-    amount = variables['boost']['base'] + variables['boost']['per_level'] * skill.level
-    duration = variables['duration']['base'] + variables['duration']['per_level'] * skill.level
-    skill._delay = player.shift_property('speed', amount, duration)
+    player.speed += values.boost
+    skill.state.delay = scheduler.delay(values.duration, _end_boost, player, values.boost)
 
 
 def player_death(skill, **eargs):
-    if skill._delay is not None and skill._delay.running:
-        skill._delay.cancel()
-        skill._delay = None
+    if skill.state.delay is not None and skill.state.delay.running:
+        skill.state.delay.cancel()
+        _end_boost(*skill.state.delay.args)
 
 
-player_disconnect = player_death
+def player_disconnect(skill, **eargs):
+    if skill.state.delay is not None:
+        skill.state.delay.cancel()
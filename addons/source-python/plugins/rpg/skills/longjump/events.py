@@ -1,6 +1,5 @@
-def player_jump(player, skill, variables, **eargs):
+def player_jump(player, values, **eargs):
     v = player.velocity
-    multiplier = 1 + variables['velocity_multiplier_per_level'] * skill.level
-    v.x *= multiplier
-    v.y *= multiplier
+    v.x *= values.velocity_multiplier
+    v.y *= values.velocity_multiplier
     player.base_velocity = v
@@ -1,32 +1,32 @@
-from listeners.tick import Repeat
+from rpg.scheduler import scheduler
 
 
-def init(player, skill):
-    skill.tick_repeat = Repeat(_tick)
-
-
-def _tick(stop_ticking, player, regeneration_per_tick):
+def _tick(skill, player, regeneration_per_tick):
     player.health = min(player.health + regeneration_per_tick, player.max_health)
     if player.health >= player.max_health:
-        stop_ticking()
+        skill.state.tick_repeat.cancel()
 
 
-def player_victim(skill, player, variables, **eargs):
-    regeneration_per_second = skill.level * variables['regeneration_per_second_per_level']
-    skill.tick_repeat.args = (skill.tick_repeat.stop, player, regeneration_per_second)
-    skill.tick_repeat.start(1)
+def player_victim(skill, player, values, **eargs):
+    regeneration_per_second = values.regeneration_per_second
+    if skill.state.tick_repeat is None:
+        skill.state.tick_repeat = scheduler.repeat(1, _tick, skill, player, regeneration_per_second)
+    else:
+        skill.state.tick_repeat.args = (skill, player, regeneration_per_second)
+        skill.state.tick_repeat.reschedule()
 
 
 skill_upgrade = player_victim
 
 
 def player_death(skill, **eargs):
-    skill.tick_repeat.stop()
+    if skill.state.tick_repeat is not None:
+        skill.state.tick_repeat.cancel()
 
 
 player_disconnect = player_death
 
 
 def player_downgrade_skill(skill, **eargs):
-    if skill.level == 0:
-        skill.tick_repeat.stop()
+    if skill.level == 0 and skill.state.tick_repeat is not None:
+        skill.state.tick_repeat.cancel()
@@ -1,6 +1,5 @@
-def player_spawn(player, skill, variables, **eargs):
-    amount = variables['base_stealth'] + variables['stealth_per_level'] * skill.level
-    player.color = player.color.with_alpha(int(255 * (1 - amount)))
+def player_spawn(player, values, **eargs):
+    player.color = player.color.with_alpha(int(255 * (1 - values.stealth)))
 
 
 skill_upgrade = player_spawn
\ No newline at end of file
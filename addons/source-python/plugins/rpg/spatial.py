@@ -0,0 +1,160 @@
+# Python imports
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+# Site-Package imports
+import numpy as np
+
+# RPG imports
+from .player import Player
+
+
+# A player, a `Vector`, or a sequence of three coordinates
+Point = Union[Player, Sequence[float]]
+
+# Teams whose players are included in the snapshots
+_PLAYING_TEAMS = (2, 3)
+
+
+class SpatialSnapshot:
+    """Positions and teams of the live players at one moment.
+
+    The data is stored into contiguous NumPy arrays, where
+    each row matches the player at the same index in `players`,
+    so a query over every player is a single vectorized computation
+    instead of an engine call per player.
+    """
+
+    def __init__(self, players: Iterable[Player]) -> None:
+        self.players: List[Player] = []
+        rows = []
+        teams = []
+        for player in players:
+            team = player.team
+            if team not in _PLAYING_TEAMS or player.dead:
+                continue
+            origin = player.origin
+            self.players.append(player)
+            rows.append((origin.x, origin.y, origin.z))
+            teams.append(team)
+        self.positions = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        self.teams = np.array(teams, dtype=np.int8)
+        self._rows: Dict[int, int] = {player.index: row for row, player in enumerate(self.players)}
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def position(self, point: Point) -> np.ndarray:
+        """Get a point's position, from the snapshot if it's a player in it."""
+        if isinstance(point, Player):
+            row = self._rows.get(point.index)
+            if row is not None and self.players[row] is point:
+                return self.positions[row]
+            point = point.origin
+        if hasattr(point, 'x'):
+            return np.array((point.x, point.y, point.z), dtype=np.float64)
+        return np.asarray(point, dtype=np.float64)
+
+    def _squared_distances(self,
+        point: Point,
+        team: Optional[int],
+        exclude: Optional[Player],
+    ) -> np.ndarray:
+        """Get the squared distance from the point to every player.
+
+        Players from other teams than `team` and the `exclude` player
+        are given an infinite distance.
+        """
+        deltas = self.positions - self.position(point)
+        distances = np.einsum('ij,ij->i', deltas, deltas)
+        if team is not None:
+            distances[self.teams != team] = np.inf
+        if exclude is not None:
+            row = self._rows.get(exclude.index)
+            if row is not None:
+                distances[row] = np.inf
+        return distances
+
+    def within(self,
+        point: Point,
+        radius: float,
+        *,
+        team: Optional[int]=None,
+        exclude: Optional[Player]=None,
+    ) -> List[Player]:
+        """Get the players within a radius of the point, nearest first.
+
+        Optionally only from one `team`, and without the `exclude` player,
+        usually the one casting the effect.
+        """
+        if not self.players:
+            return []
+        distances = self._squared_distances(point, team, exclude)
+        rows = np.flatnonzero(distances <= radius * radius)
+        rows = rows[np.argsort(distances[rows], kind='stable')]
+        players = self.players
+        return [players[row] for row in rows]
+
+    def nearest(self,
+        point: Point,
+        count: int,
+        *,
+        radius: Optional[float]=None,
+        team: Optional[int]=None,
+        exclude: Optional[Player]=None,
+    ) -> List[Player]:
+        """Get up to `count` players nearest to the point, nearest first.
+
+        Supports the same filters as `within()`, and an optional
+        maximum `radius` for the players to be included.
+        """
+        if not self.players or count <= 0:
+            return []
+        distances = self._squared_distances(point, team, exclude)
+        if count < len(distances):
+            rows = np.argpartition(distances, count - 1)[:count]
+        else:
+            rows = np.arange(len(distances))
+        rows = rows[np.argsort(distances[rows], kind='stable')]
+        if radius is None:
+            rows = rows[np.isfinite(distances[rows])]
+        else:
+            rows = rows[distances[rows] <= radius * radius]
+        players = self.players
+        return [players[row] for row in rows]
+
+
+class SpatialIndex:
+    """Lazily captured `SpatialSnapshot` of the current tick.
+
+    The snapshot is only captured when it's first queried during a tick,
+    so ticks without any area-of-effect skills cost nothing.
+    The plugin calls `invalidate()` on every tick and whenever
+    a player leaves, and sets the `source` of the players.
+    """
+
+    def __init__(self, source: Optional[Callable[[], Iterable[Player]]]=None) -> None:
+        self.source = source
+        self._snapshot: Optional[SpatialSnapshot] = None
+
+    @property
+    def snapshot(self) -> SpatialSnapshot:
+        """Get the current tick's snapshot, capturing it if needed."""
+        if self._snapshot is None:
+            self._snapshot = SpatialSnapshot(() if self.source is None else self.source())
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Drop the snapshot, so it gets recaptured by the next query."""
+        self._snapshot = None
+
+    def within(self, point: Point, radius: float, **filters) -> List[Player]:
+        """Get the players within a radius of the point, see `SpatialSnapshot.within()`."""
+        return self.snapshot.within(point, radius, **filters)
+
+    def nearest(self, point: Point, count: int, **filters) -> List[Player]:
+        """Get the players nearest to the point, see `SpatialSnapshot.nearest()`."""
+        return self.snapshot.nearest(point, count, **filters)
+
+
+# Shared positions for skills, invalidated by the plugin on every tick
+positions = SpatialIndex()
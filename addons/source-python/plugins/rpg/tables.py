@@ -0,0 +1,86 @@
+# Site-Package imports
+from sqlalchemy import inspect, Boolean, Column, ForeignKey, Index, Integer, MetaData, Table, Text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+
+# Initialize table metadata.
+# Kept apart from `rpg.database` so that the tables can be used
+# without Source.Python, like in the `rpg.transfer` tool.
+metadata = MetaData()
+player_table = Table('rpg_player', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('steamid', Text, nullable=False, unique=True),
+    Column('level', Integer, nullable=False, default=0),
+    Column('xp', Integer, nullable=False, default=0),
+    Column('credits', Integer, nullable=False, default=0),
+    Column('name', Text, nullable=True),
+    Column('version', Integer, nullable=False, default=0, server_default='0'),
+    Index('ix_rpg_player_level_xp', 'level', 'xp'),
+)
+
+skill_key_table = Table('rpg_skill_key', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('key', Text, nullable=False, unique=True),
+)
+
+skill_table = Table('rpg_skill', metadata,
+    Column('player_id', Integer, ForeignKey('rpg_player.id'), nullable=False),
+    Column('skill_id', Integer, ForeignKey('rpg_skill_key.id'), nullable=False),
+    Column('level', Integer, nullable=False, default=0),
+    Index('ix_rpg_skill_player_skill', 'player_id', 'skill_id', unique=True),
+)
+
+migration_table = Table('rpg_migration', metadata,
+    Column('name', Text, primary_key=True),
+    Column('position', Text, nullable=True),
+    Column('done', Boolean, nullable=False, default=False),
+)
+
+# Tables of the old, denormalized layout, only used for migrating from
+legacy_metadata = MetaData()
+legacy_player_table = Table('player', legacy_metadata,
+    Column('steamid', Text, primary_key=True),
+    Column('level', Integer, nullable=False, default=0),
+    Column('xp', Integer, nullable=False, default=0),
+    Column('credits', Integer, nullable=False, default=0),
+)
+
+legacy_skill_table = Table('skill', legacy_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('key', Text, nullable=False),
+    Column('level', Integer, nullable=False, default=0),
+    Column('steamid', Text, ForeignKey('player.steamid'), nullable=False),
+)
+legacy_skill_index = Index('ix_skill_steamid', legacy_skill_table.c.steamid)
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Add columns and indexes missing from previously created tables.
+
+    `create_all()` only creates whole tables, so anything added
+    to an existing table's definition has to be added separately.
+    New columns must be nullable or have a `server_default`.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                engine.execute(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}')
+        for index in table.indexes:
+            create_missing_index(engine, index)
+
+
+def has_index(engine: Engine, index: Index) -> bool:
+    """Check if an index's table already has an index of the same name."""
+    indexes = inspect(engine).get_indexes(index.table.name)
+    return any(existing['name'] == index.name for existing in indexes)
+
+
+def create_missing_index(engine: Engine, index: Index) -> None:
+    """Create an index unless its table already has an index of the same name."""
+    if not has_index(engine, index):
+        index.create(bind=engine)
@@ -0,0 +1,99 @@
+# Python imports
+import gzip
+import json
+from time import monotonic, time
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+# Source.Python imports
+from path import Path
+
+
+_FORMAT = 'rpg-trace'
+_VERSION = 1
+
+# Events handled by the plugin, and thus recorded by the `EventRecorder`
+TRACED_EVENTS = ('player_hurt', 'player_death', 'player_jump', 'player_spawn', 'player_disconnect')
+
+TraceEvent = Tuple[float, str, Dict[str, Any]]  # (seconds since start, event name, variables)
+
+
+class EventRecorder:
+    """Recorder of the game events reaching the plugin.
+
+    Writes the events into a gzipped JSON Lines file, where each
+    event's variables are stored as a plain list of values.
+    The event's name and variable names are written only once
+    into a schema line, which the event lines then refer to by ID.
+    Each event line is of the format `[delay, schema_id, *values]`,
+    where the `delay` is the microseconds since the previous event.
+
+    The file is written through a buffer, so `record()` rarely
+    touches the disk, and nothing at all is done while not running.
+    """
+
+    def __init__(self, clock: Callable[[], float]=monotonic) -> None:
+        self.clock = clock
+        self.path: Optional[Path] = None
+        self.count = 0
+        self._file: Optional[IO[str]] = None
+        self._schemas: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self._previous = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the recorder is currently recording events."""
+        return self._file is not None
+
+    def start(self, path: Path) -> None:
+        """Start recording into a new file, stopping any previous recording."""
+        self.stop()
+        self._file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=1)
+        self._file.write(json.dumps({'format': _FORMAT, 'version': _VERSION, 'started': time()}) + '\n')
+        self.path = path
+        self.count = 0
+        self._schemas.clear()
+        self._previous = self.clock()
+
+    def stop(self) -> None:
+        """Stop recording and close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record(self, name: str, variables: Dict[str, Any]) -> None:
+        """Record an event with its variables, if the recorder is running."""
+        if self._file is None:
+            return
+        keys = tuple(variables)
+        schema_id = self._schemas.get((name, keys))
+        if schema_id is None:
+            schema_id = self._schemas[name, keys] = len(self._schemas)
+            self._file.write(json.dumps({'schema': schema_id, 'event': name, 'keys': keys}) + '\n')
+        now = self.clock()
+        delay, self._previous = int((now - self._previous) * 1e6), now
+        self._file.write(json.dumps([delay, schema_id, *variables.values()], separators=(',', ':')) + '\n')
+        self.count += 1
+
+
+def read_trace(path: Path) -> Iterator[TraceEvent]:
+    """Read the events of a recording made by `EventRecorder`."""
+    with gzip.open(path, 'rt', encoding='utf-8') as trace_file:
+        header = json.loads(trace_file.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != _FORMAT:
+            raise ValueError(f"File '{path}' is not an RPG event trace")
+        if header.get('version') != _VERSION:
+            raise ValueError(f"Unsupported event trace version '{header.get('version')}'")
+        schemas: Dict[int, Tuple[str, List[str]]] = {}
+        elapsed = 0
+        try:
+            for line in trace_file:
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    schemas[record['schema']] = (record['event'], record['keys'])
+                    continue
+                delay, schema_id, *values = record
+                elapsed += delay
+                name, keys = schemas[schema_id]
+                yield elapsed / 1e6, name, dict(zip(keys, values))
+        except EOFError:
+            return  # Recording was cut short, like by a crash
@@ -0,0 +1,428 @@
+"""Export and import RPG:SP's players as JSON Lines.
+
+Players are streamed with their skills in batches, each batch
+in its own short transaction, so even huge databases are transferred
+in constant memory without blocking a running server's writes for long.
+Every line is a JSON object like:
+
+    {"steamid": "STEAM_1:0:1", "name": "Mahi", "level": 3, "xp": 40, "credits": 15, "skills": {"health": 2}}
+
+Run from the `plugins` directory with SQLAlchemy database URLs:
+
+    python -m rpg.transfer export sqlite:///old/rpg.db players.jsonl
+    python -m rpg.transfer import sqlite:///new/rpg.db players.jsonl
+
+Before a running server migrates a big database from the old
+`player` and `skill` tables, index the old skill table while the
+server is stopped, since indexing locks the whole database:
+
+    python -m rpg.transfer index-legacy sqlite:///old/rpg.db
+
+With `--checkpoint FILE` the progress is saved after every batch,
+and rerunning an interrupted transfer resumes from the checkpoint.
+Importing a batch only writes absolute values, so it's safe to
+repeat a batch whose checkpoint didn't get saved.
+"""
+# Python imports
+import argparse
+import json
+import os
+from time import sleep
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Site-Package imports
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import and_, select
+from sqlalchemy.sql.expression import bindparam
+
+# RPG imports
+from .tables import (
+    create_missing_index, has_index, legacy_player_table, legacy_skill_index, legacy_skill_table,
+    metadata, player_table, skill_key_table, skill_table, upgrade_schema,
+)
+
+
+Record = Dict[str, Any]
+
+# SQLite limits the amount of variables per statement
+MAX_BATCH_SIZE = 500
+
+
+# ========================
+#  Checkpoints
+# ========================
+
+def read_checkpoint(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Read a checkpoint file, or return `None` if there's none."""
+    if path is None:
+        return None
+    try:
+        with open(path, encoding='utf-8') as checkpoint_file:
+            return json.load(checkpoint_file)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path: Optional[str], checkpoint: Dict[str, Any]) -> None:
+    """Atomically replace a checkpoint file."""
+    if path is None:
+        return
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temp_path, path)
+
+
+# ========================
+#  Export
+# ========================
+
+def read_batches(
+    engine: Engine,
+    batch_size: int,
+    position: Any=None,
+    *,
+    legacy: bool=False,
+) -> Iterator[Tuple[Any, List[Record]]]:
+    """Read players with their skills in batches.
+
+    Players are read in the order of their primary key,
+    and each batch continues after the previous batch's last key,
+    which is yielded as the `position` to resume from.
+    With `legacy` set, the players are read from the legacy tables.
+    """
+    read_batch = _read_legacy_batch if legacy else _read_batch
+    while True:
+        with engine.connect() as conn:
+            position, records = read_batch(conn, batch_size, position)
+        if not records:
+            return
+        yield position, records
+
+
+def _read_batch(conn, batch_size: int, after: Optional[int]) -> Tuple[Optional[int], List[Record]]:
+    query = select([player_table]).order_by(player_table.c.id).limit(batch_size)
+    if after is not None:
+        query = query.where(player_table.c.id > after)
+    rows = conn.execute(query).fetchall()
+    if not rows:
+        return after, []
+
+    # The batch's IDs are consecutive in the key order, so a range covers them,
+    # but it can also cover skills whose player no longer exists
+    skills = {row.id: {} for row in rows}
+    result = conn.execute(
+        select([skill_table.c.player_id, skill_key_table.c.key, skill_table.c.level])
+        .select_from(skill_table.join(skill_key_table, skill_table.c.skill_id==skill_key_table.c.id))
+        .where(skill_table.c.player_id.between(rows[0].id, rows[-1].id))
+    )
+    for player_id, key, level in result:
+        if player_id in skills:
+            skills[player_id][key] = level
+
+    records = [
+        {
+            'steamid': row.steamid,
+            'name': row.name,
+            'level': row.level,
+            'xp': row.xp,
+            'credits': row.credits,
+            'skills': skills[row.id],
+        }
+        for row in rows
+    ]
+    return rows[-1].id, records
+
+
+def _read_legacy_batch(conn, batch_size: int, after: Optional[str]) -> Tuple[Optional[str], List[Record]]:
+    legacy_player, legacy_skill = legacy_player_table, legacy_skill_table
+    query = select([legacy_player]).order_by(legacy_player.c.steamid).limit(batch_size)
+    if after is not None:
+        query = query.where(legacy_player.c.steamid > after)
+    rows = conn.execute(query).fetchall()
+    if not rows:
+        return after, []
+
+    skills = {row.steamid: {} for row in rows}
+    result = conn.execute(
+        select([legacy_skill.c.steamid, legacy_skill.c.key, legacy_skill.c.level])
+        .where(legacy_skill.c.steamid.between(rows[0].steamid, rows[-1].steamid))
+    )
+    for steamid, key, level in result:
+        if steamid in skills:
+            skills[steamid][key] = level
+
+    records = [
+        {
+            'steamid': row.steamid,
+            'name': None,
+            'level': row.level,
+            'xp': row.xp,
+            'credits': row.credits,
+            'skills': skills[row.steamid],
+        }
+        for row in rows
+    ]
+    return rows[-1].steamid, records
+
+
+def export_players(
+    engine: Engine,
+    path: str,
+    *,
+    batch_size: int=MAX_BATCH_SIZE,
+    checkpoint_path: Optional[str]=None,
+    legacy: bool=False,
+    pause: float=0.0,
+) -> int:
+    """Export players into a JSON Lines file.
+
+    The file is synced before each checkpoint, so after resuming,
+    anything written past the checkpoint is truncated away.
+    Exporting from the legacy tables requires their index,
+    which must be created offline with `index-legacy` first.
+    Returns the total amount of exported players.
+    """
+    if legacy and not has_index(engine, legacy_skill_index):
+        raise ValueError(
+            "The legacy skill table isn't indexed, stop the server and run "
+            "'python -m rpg.transfer index-legacy URL' first"
+        )
+
+    checkpoint = read_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        if checkpoint.get('legacy', False) != legacy:
+            raise ValueError(f"Checkpoint '{checkpoint_path}' is for a different source")
+        output = open(path, 'r+b')
+        output.truncate(checkpoint['offset'])
+        output.seek(checkpoint['offset'])
+        position, count = checkpoint['position'], checkpoint['count']
+    else:
+        output = open(path, 'wb')
+        position, count = None, 0
+
+    with output:
+        for position, records in read_batches(engine, batch_size, position, legacy=legacy):
+            output.writelines(
+                json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+                for record in records
+            )
+            output.flush()
+            os.fsync(output.fileno())
+            count += len(records)
+            write_checkpoint(checkpoint_path, {
+                'legacy': legacy,
+                'position': position,
+                'offset': output.tell(),
+                'count': count,
+            })
+            if pause:
+                sleep(pause)
+    return count
+
+
+# ========================
+#  Import
+# ========================
+
+def read_records(path: str, batch_size: int, offset: int=0) -> Iterator[Tuple[int, List[Record]]]:
+    """Read players from a JSON Lines file in batches.
+
+    Yields each batch with the byte offset of the line following it.
+    """
+    with open(path, 'rb') as input_file:
+        input_file.seek(offset)
+        records = []
+        for line in iter(input_file.readline, b''):
+            if line.strip():
+                records.append(json.loads(line))
+            if len(records) >= batch_size:
+                yield input_file.tell(), records
+                records = []
+        if records:
+            yield input_file.tell(), records
+
+
+def import_batch(engine: Engine, records: Iterable[Record], *, overwrite: bool=True) -> None:
+    """Insert or update a batch of players in a single transaction.
+
+    Existing players and their skills are overwritten,
+    unless `overwrite` is unset, in which case they're left untouched.
+    """
+    records = {record['steamid']: record for record in records}  # The latest line wins
+    keys = {key for record in records.values() for key in record['skills']}
+    with engine.begin() as conn:
+        key_ids = _skill_key_ids(conn, keys)
+
+        player_ids = _player_ids(conn, records)
+        new_steamids = [steamid for steamid in records if steamid not in player_ids]
+        if new_steamids:
+            conn.execute(player_table.insert(), [
+                _player_values(records[steamid], steamid=steamid)
+                for steamid in new_steamids
+            ])
+        if overwrite and player_ids:
+            conn.execute(
+                player_table.update().where(player_table.c.id==bindparam('b_id')).values(
+                    name=bindparam('name'),
+                    level=bindparam('level'),
+                    xp=bindparam('xp'),
+                    credits=bindparam('credits'),
+                    version=player_table.c.version + 1,
+                ),
+                [
+                    _player_values(records[steamid], b_id=player_id)
+                    for steamid, player_id in player_ids.items()
+                ]
+            )
+            written = records
+        else:
+            written = new_steamids
+        if new_steamids:
+            player_ids.update(_player_ids(conn, new_steamids))
+
+        if not written:
+            return
+        existing_skills = {
+            tuple(row) for row in conn.execute(
+                select([skill_table.c.player_id, skill_table.c.skill_id])
+                .where(skill_table.c.player_id.in_([player_ids[steamid] for steamid in written]))
+            )
+        }
+        inserts, updates = [], []
+        for steamid in written:
+            player_id = player_ids[steamid]
+            for key, level in records[steamid]['skills'].items():
+                if (player_id, key_ids[key]) in existing_skills:
+                    updates.append({'b_player_id': player_id, 'b_skill_id': key_ids[key], 'level': level})
+                else:
+                    inserts.append({'player_id': player_id, 'skill_id': key_ids[key], 'level': level})
+        if inserts:
+            conn.execute(skill_table.insert(), inserts)
+        if updates:
+            conn.execute(
+                skill_table.update().where(and_(
+                    skill_table.c.player_id==bindparam('b_player_id'),
+                    skill_table.c.skill_id==bindparam('b_skill_id'),
+                )).values(
+                    level=bindparam('level'),
+                ),
+                updates
+            )
+
+
+def _player_values(record: Record, **values: Any) -> Dict[str, Any]:
+    values.update(
+        name=record.get('name'),
+        level=record['level'],
+        xp=record['xp'],
+        credits=record['credits'],
+    )
+    return values
+
+
+def _player_ids(conn, steamids: Iterable[str]) -> Dict[str, int]:
+    result = conn.execute(
+        select([player_table.c.steamid, player_table.c.id])
+        .where(player_table.c.steamid.in_(list(steamids)))
+    )
+    return dict(result.fetchall())
+
+
+def _skill_key_ids(conn, keys: Iterable[str]) -> Dict[str, int]:
+    """Get the IDs of skill keys, inserting the missing keys."""
+    keys = list(keys)
+    query = select([skill_key_table.c.key, skill_key_table.c.id]).where(skill_key_table.c.key.in_(keys))
+    key_ids = dict(conn.execute(query).fetchall())
+    missing = [key for key in keys if key not in key_ids]
+    if missing:
+        conn.execute(skill_key_table.insert(), [{'key': key} for key in missing])
+        key_ids = dict(conn.execute(query).fetchall())
+    return key_ids
+
+
+def import_players(
+    engine: Engine,
+    path: str,
+    *,
+    batch_size: int=MAX_BATCH_SIZE,
+    checkpoint_path: Optional[str]=None,
+    overwrite: bool=True,
+    pause: float=0.0,
+) -> int:
+    """Import players from a JSON Lines file.
+
+    Creates any missing tables first.
+    Returns the total amount of imported players.
+    """
+    metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    checkpoint = read_checkpoint(checkpoint_path)
+    offset, count = (0, 0) if checkpoint is None else (checkpoint['offset'], checkpoint['count'])
+
+    for offset, records in read_records(path, batch_size, offset):
+        import_batch(engine, records, overwrite=overwrite)
+        count += len(records)
+        write_checkpoint(checkpoint_path, {'offset': offset, 'count': count})
+        if pause:
+            sleep(pause)
+    return count
+
+
+# ========================
+#  Command line
+# ========================
+
+def main(argv: Optional[List[str]]=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m rpg.transfer', description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('export', 'import', 'index-legacy'))
+    parser.add_argument('url', help="SQLAlchemy database URL, like 'sqlite:///rpg.db'")
+    parser.add_argument('path', nargs='?', help='JSON Lines file to export into or import from')
+    parser.add_argument('-b', '--batch-size', type=int, default=MAX_BATCH_SIZE,
+        help=f'players per transaction, at most {MAX_BATCH_SIZE}')
+    parser.add_argument('-c', '--checkpoint', help='file for saving and resuming the progress')
+    parser.add_argument('-p', '--pause', type=float, default=0.0, help='seconds to sleep between batches')
+    parser.add_argument('--legacy', action='store_true', help='export from the old player and skill tables')
+    parser.add_argument('--keep-existing', action='store_true', help="don't overwrite existing players on import")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.batch_size <= MAX_BATCH_SIZE:
+        parser.error(f'--batch-size must be between 1 and {MAX_BATCH_SIZE}')
+    if args.path is None and args.command != 'index-legacy':
+        parser.error(f'{args.command} requires a path')
+
+    engine = create_engine(args.url)
+    if args.command == 'index-legacy':
+        create_missing_index(engine, legacy_skill_index)
+        print('Indexed the legacy skill table')
+    elif args.command == 'export':
+        try:
+            count = export_players(
+                engine,
+                args.path,
+                batch_size=args.batch_size,
+                checkpoint_path=args.checkpoint,
+                legacy=args.legacy,
+                pause=args.pause,
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        print(f'Exported {count} players')
+    else:
+        count = import_players(
+            engine,
+            args.path,
+            batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint,
+            overwrite=not args.keep_existing,
+            pause=args.pause,
+        )
+        print(f'Imported {count} players')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 # Python imports
-from math import sqrt
+from math import isqrt, sqrt
 from random import shuffle
-from typing import Any, Dict, Iterable, List, Optional, TypeVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypeVar
 
 
 T = TypeVar('T')
@@ -23,3 +23,45 @@ def shuffled(iterable: Iterable[T]) -> List[T]:
     copy = list(iterable)
     shuffle(copy)
     return copy
+
+
+def levels_to_xp(levels: int, level: int, base: int, per_level: int) -> int:
+    """Get the total XP cost of gaining `levels` levels from `level`.
+
+    Leveling up from level `n` requires `base + per_level * n` XP,
+    so the cost is the sum of an arithmetic series.
+    """
+    return levels * (base + per_level * level) + per_level * (levels * (levels - 1) // 2)
+
+
+def xp_to_levels(xp: int, level: int, base: int, per_level: int) -> Tuple[int, int]:
+    """Split XP into gained levels and the remaining XP.
+
+    Leveling up from level `n` requires `base + per_level * n` XP,
+    so the total XP cost of `k` levels is an arithmetic series,
+    and the amount of levels is solved from its quadratic equation
+    in constant time regardless of the amount of XP.
+    Returns a `(levels, remaining_xp)` tuple.
+    """
+    first = base + per_level * level
+    if first <= 0:
+        raise ValueError(f"Non-positive XP requirement '{first}' for level '{level}'")
+
+    def cost(levels):
+        return levels * first + per_level * (levels * (levels - 1) // 2)
+
+    if per_level == 0:
+        levels = int(xp // first)
+    else:
+        # Solve per_level/2 * k^2 + (first - per_level/2) * k = xp for k
+        b = 2 * first - per_level
+        discriminant = b * b + 8 * per_level * xp
+        root = isqrt(discriminant) if isinstance(discriminant, int) else int(sqrt(discriminant))
+        levels = max(int((root - b) // (2 * per_level)), 0)
+
+    # Correct any rounding errors of the square root
+    while levels > 0 and cost(levels) > xp:
+        levels -= 1
+    while cost(levels + 1) <= xp:
+        levels += 1
+    return levels, xp - cost(levels)
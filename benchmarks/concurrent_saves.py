@@ -0,0 +1,127 @@
+"""Check that concurrent saves from several processes don't lose progress.
+
+Starts multiple processes which all load the same player from one
+SQLite file, keep giving them XP, credits, and skill levels,
+and save the changes without any coordination between the processes.
+Finally checks that the database contains every process's changes:
+
+    python benchmarks/concurrent_saves.py --processes 4 --rounds 200
+"""
+# Python imports
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+BENCHMARKS_PATH = Path(__file__).resolve().parent
+ROOT_PATH = BENCHMARKS_PATH.parent
+
+SKILL_KEYS = ('alpha', 'beta', 'gamma')
+
+
+def _setup_imports(data_path: str) -> None:
+    os.environ['RPG_BENCH_DATA_PATH'] = data_path
+    sys.path[:0] = [
+        str(BENCHMARKS_PATH / 'stubs'),
+        str(ROOT_PATH / 'addons' / 'source-python' / 'plugins'),
+    ]
+
+
+def _new_player():
+    import rpg.player
+    import rpg.skill
+    player = rpg.player.Player(1)
+    for key in SKILL_KEYS:
+        player.add_skill(rpg.skill.Skill(rpg.skill.SkillType(key)))
+    return player
+
+
+def _total_xp(level: int, xp: int) -> int:
+    import rpg.config
+    from rpg.utils import levels_to_xp
+    return levels_to_xp(level, 0, rpg.config.REQUIRED_XP['base'], rpg.config.REQUIRED_XP['per_level']) + xp
+
+
+def worker(data_path: str, rounds: int, seed: int) -> Tuple[int, int, Dict[str, int]]:
+    """Play and save the shared player, returning the saved changes."""
+    _setup_imports(data_path)
+    import sqlalchemy.exc
+    import rpg.database
+    import rpg.persistence
+
+    random.seed(seed)
+    player = _new_player()
+    rpg.database.load_player(player)
+    xp_change, credits_change = 0, 0
+    skill_changes = dict.fromkeys(SKILL_KEYS, 0)
+    skills_by_id = {skill._db_id: skill.key for skill in player.skills}
+
+    for _ in range(rounds):
+        player.give_xp(random.randint(1, 500))
+        if random.random() < 0.3:
+            skill = random.choice(list(player.skills))
+            skill.level += 1
+            skill._dirty = True
+            player.credits -= 1
+        snapshot = rpg.persistence.take_snapshot(player)
+        while True:
+            try:
+                rpg.database.save_snapshots([snapshot])
+                break
+            except sqlalchemy.exc.OperationalError:
+                time.sleep(0.01)  # Database locked by another process
+        xp_change += _total_xp(snapshot.level, snapshot.xp) - _total_xp(*snapshot.base[:2])
+        credits_change += snapshot.credits - snapshot.base[2]
+        for skill_id, (base_level, level) in snapshot.skills.items():
+            skill_changes[skills_by_id[skill_id]] += level - base_level
+        time.sleep(random.random() * 0.002)
+    return xp_change, credits_change, skill_changes
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-p', '--processes', type=int, default=4)
+    parser.add_argument('-r', '--rounds', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    data_path = tempfile.mkdtemp(prefix='rpg-concurrency-')
+    _setup_imports(data_path)
+    import rpg.database
+
+    # Create the player before the workers to avoid racing for it
+    player = _new_player()
+    if not rpg.database.load_player(player):
+        rpg.database.create_player(player)
+    rpg.database.engine.dispose()
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(args.processes) as pool:
+        results = pool.starmap(worker, [(data_path, args.rounds, seed) for seed in range(args.processes)])
+    elapsed = time.perf_counter() - start
+
+    expected_xp = sum(result[0] for result in results)
+    expected_credits = sum(result[1] for result in results)
+    expected_skills = {key: sum(result[2][key] for result in results) for key in SKILL_KEYS}
+
+    player = _new_player()
+    rpg.database.load_player(player)
+    actual_xp = _total_xp(player.level, player.xp)
+    actual_skills = {skill.key: skill.level for skill in player.skills}
+
+    print(f'{args.processes} processes, {args.rounds} saves each in {elapsed:.2f}s')
+    print(f'XP:      expected {expected_xp}, saved {actual_xp}')
+    print(f'Credits: expected {expected_credits}, saved {player.credits}')
+    print(f'Skills:  expected {expected_skills}, saved {actual_skills}')
+    ok = (actual_xp, player.credits, actual_skills) == (expected_xp, expected_credits, expected_skills)
+    print('OK' if ok else 'LOST UPDATES')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
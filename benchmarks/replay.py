@@ -0,0 +1,158 @@
+"""Replay a recorded match through the plugin as a regression benchmark.
+
+Feeds the events recorded with the plugin's `rpg_trace` command
+through the plugin's event handlers, XP, and database code
+as fast as possible, using the stand-in Source.Python modules.
+Ticks, scheduled skill calls, and periodic saves are run
+on a virtual clock that follows the recording's timestamps:
+
+    python benchmarks/replay.py rpg_trace.jsonl.gz --output before.json
+    python benchmarks/replay.py rpg_trace.jsonl.gz --compare before.json
+
+Players are created from the userids, so their steamids and teams
+come from the stand-in player instead of the actual server.
+"""
+# Python imports
+import argparse
+import json
+import platform
+import sys
+from collections import defaultdict
+from time import perf_counter_ns
+from typing import Dict, List
+
+# Benchmark imports, sets up the stand-ins and loads the plugin
+from run import git_commit, plugin
+
+# Stand-in imports
+import events
+import listeners
+
+# RPG imports
+import rpg.config
+import rpg.scheduler
+import rpg.trace
+
+# Tick interval of a 64 tick server
+TICK_INTERVAL = 1 / 64
+
+
+class VirtualClock:
+    """Clock which only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def percentiles(timings: List[int]) -> Dict[str, float]:
+    """Get the percentiles of nanosecond timings in microseconds."""
+    timings = sorted(timings)
+    def at(fraction: float) -> float:
+        return timings[min(int(len(timings) * fraction), len(timings) - 1)] / 1e3
+    return {
+        'count': len(timings),
+        'p50_us': at(0.5),
+        'p90_us': at(0.9),
+        'p99_us': at(0.99),
+        'max_us': timings[-1] / 1e3,
+    }
+
+
+def replay(path: str) -> Dict[str, object]:
+    """Replay a recording and return its timings."""
+    clock = VirtualClock()
+    rpg.scheduler.scheduler.clock = clock
+    plugin.xp_accumulator.clock = clock
+
+    periodic = [[rpg.config.SAVE_INTERVAL, plugin.save_all_players]]
+    if plugin.journal is not None:
+        periodic.append([rpg.config.JOURNAL_SYNC_INTERVAL, plugin.journal.sync])
+    for timer in periodic:
+        timer.append(timer[0])  # Next call time
+
+    timings = defaultdict(list)
+    next_tick = 0.0
+    start = perf_counter_ns()
+    for time, name, variables in rpg.trace.read_trace(path):
+        while next_tick <= time:
+            clock.now = next_tick
+            tick_start = perf_counter_ns()
+            listeners.OnTick.manager.notify()
+            for timer in periodic:
+                if timer[2] <= next_tick:
+                    timer[1]()
+                    timer[2] += timer[0]
+            timings['tick'].append(perf_counter_ns() - tick_start)
+            next_tick += TICK_INTERVAL
+        clock.now = time
+        event = events.GameEvent(name, **variables)
+        event_start = perf_counter_ns()
+        for callback in events.registry.get(name, ()):
+            callback(event)
+        timings[name].append(perf_counter_ns() - event_start)
+    replay_ns = perf_counter_ns() - start
+
+    flush_start = perf_counter_ns()
+    plugin.xp_accumulator.flush()
+    plugin.save_all_players()
+    plugin.save_queue.flush()
+    flush_ns = perf_counter_ns() - flush_start
+
+    event_count = sum(len(timings[name]) for name in timings if name != 'tick')
+    return {
+        'events': event_count,
+        'ticks': len(timings['tick']),
+        'recorded_s': next_tick,
+        'replay_s': replay_ns / 1e9,
+        'events_per_s': event_count / (replay_ns / 1e9) if replay_ns else 0.0,
+        'final_save_s': flush_ns / 1e9,
+        'timings': {name: percentiles(values) for name, values in sorted(timings.items())},
+    }
+
+
+def compare(old: Dict[str, object], new: Dict[str, object]) -> str:
+    """Format a table comparing two replays's latency percentiles."""
+    lines = [f"{'timing':<30} {'old p50':>10} {'new p50':>10} {'old p99':>10} {'new p99':>10}"]
+    for name, result in new['results']['timings'].items():
+        old_result = old['results']['timings'].get(name)
+        if old_result is None:
+            lines.append(f"{name:<30} {'-':>10} {result['p50_us']:>10.2f} {'-':>10} {result['p99_us']:>10.2f}")
+        else:
+            lines.append(
+                f"{name:<30} {old_result['p50_us']:>10.2f} {result['p50_us']:>10.2f}"
+                f" {old_result['p99_us']:>10.2f} {result['p99_us']:>10.2f}"
+            )
+    lines.append(f"{'events/s':<30} {old['results']['events_per_s']:>10.0f} {new['results']['events_per_s']:>10.0f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('trace', help='recording made with the rpg_trace command')
+    parser.add_argument('-o', '--output', help='write the JSON results into a file')
+    parser.add_argument('-c', '--compare', help='compare against an earlier JSON results file')
+    args = parser.parse_args(argv)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': replay(args.trace),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    if args.compare:
+        with open(args.compare) as compare_file:
+            print(compare(json.load(compare_file), report), file=sys.stderr)
+    if not args.output:
+        print(output)
+    plugin.unload()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""Offline micro-benchmarks for RPG:SP's hot paths.
+
+Runs the plugin against the stand-in Source.Python modules in `stubs/`,
+so no game server is needed, and reports the results as JSON
+to allow comparing the results between commits:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --compare before.json
+
+The plugin's data (database, journal) goes into a temporary directory.
+"""
+# Python imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+BENCHMARKS_PATH = Path(__file__).resolve().parent
+ROOT_PATH = BENCHMARKS_PATH.parent
+sys.path[:0] = [
+    str(BENCHMARKS_PATH / 'stubs'),
+    str(ROOT_PATH / 'addons' / 'source-python' / 'plugins'),
+]
+
+# Stand-in imports
+import events
+import listeners
+from path import Path as SPPath
+
+# RPG imports
+import rpg.config
+rpg.config.ASYNC_PLAYER_LOADING = False  # Load players synchronously for stable timings
+
+import rpg.builder
+import rpg.database
+import rpg.leaderboard
+import rpg.player
+import rpg.rpg as plugin
+import rpg.skill
+import rpg.spatial
+
+
+SKILLS_PATH = SPPath(ROOT_PATH / 'addons' / 'source-python' / 'plugins' / 'rpg' / 'skills')
+
+_benchmarks: Dict[str, Callable[[], Callable[[], None]]] = {}
+
+
+def benchmark(name: str, *, number: int):
+    """Register a benchmark.
+
+    The decorated function sets the benchmark up
+    and returns the function to be timed.
+    """
+    def decorator(setup):
+        setup.number = number
+        _benchmarks[name] = setup
+        return setup
+    return decorator
+
+
+def measure(func: Callable[[], None], *, number: int, repeat: int) -> Dict[str, float]:
+    """Time `func` and return per-call statistics in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((perf_counter() - start) / number * 1e6)
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_us': min(timings),
+        'median_us': median(timings),
+        'max_us': max(timings),
+    }
+
+
+# ========================
+#  Fixtures
+# ========================
+
+def maxed_player(index: int) -> rpg.player.Player:
+    """Get a player from the plugin with every skill maxed out."""
+    player = plugin.players[index]
+    for skill in player.skills:
+        skill.level = skill.max_level
+    player.rebuild_skill_index()
+    return player
+
+
+def synthetic_player(index: int, *, skills: int, subscribers: int) -> rpg.player.Player:
+    """Create a player with many maxed skills, only some handling `player_attack`."""
+    player = rpg.player.Player(index)
+    for i in range(skills):
+        callbacks = {'player_spawn': _noop_callback}
+        if i < subscribers:
+            callbacks['player_attack'] = _noop_callback
+        skill_type = rpg.skill.SkillType(f'synthetic_{i}', max_level=10, event_callbacks=callbacks)
+        player.add_skill(rpg.skill.Skill(skill_type, level=10))
+    return player
+
+
+def _noop_callback(**event_args):
+    pass
+
+
+def _attack_args(victim):
+    return {'attacker': None, 'victim': victim, 'weapon': 'ak47', 'dmg_health': 27, 'hitgroup': 2}
+
+
+# ========================
+#  Benchmarks
+# ========================
+
+@benchmark('trigger_skills.builtin.player_attack', number=20000)
+def _():
+    attacker, victim = maxed_player(1), maxed_player(2)
+    event_args = _attack_args(victim)
+    return lambda: attacker.trigger_skills('player_attack', **event_args)
+
+
+@benchmark('trigger_skills.builtin.unsubscribed', number=100000)
+def _():
+    player = maxed_player(1)
+    return lambda: player.trigger_skills('player_footstep')
+
+
+@benchmark('trigger_skills.synthetic_50.player_attack', number=20000)
+def _():
+    attacker = synthetic_player(101, skills=50, subscribers=2)
+    event_args = _attack_args(attacker)
+    return lambda: attacker.trigger_skills('player_attack', **event_args)
+
+
+@benchmark('event.player_hurt', number=10000)
+def _():
+    maxed_player(1), maxed_player(2)
+    variables = {
+        'userid': 2, 'attacker': 1, 'health': 73, 'armor': 0, 'weapon': 'ak47',
+        'dmg_health': 27, 'dmg_armor': 0, 'hitgroup': 2,
+    }
+    return lambda: events.fire('player_hurt', **variables)
+
+
+@benchmark('event.player_hurt.burst_10_and_tick', number=2000)
+def _():
+    maxed_player(1), maxed_player(2)
+    variables = {
+        'userid': 2, 'attacker': 1, 'health': 73, 'armor': 0, 'weapon': 'nova',
+        'dmg_health': 400, 'dmg_armor': 0, 'hitgroup': 2,
+    }
+
+    def burst():
+        for _ in range(10):
+            events.fire('player_hurt', **variables)
+        listeners.OnTick.manager.notify()
+    return burst
+
+
+@benchmark('give_xp.500000', number=2000)
+def _():
+    player = plugin.players[3]
+    return lambda: player.give_xp(500000)
+
+
+@benchmark('give_xp.small', number=50000)
+def _():
+    player = plugin.players[4]
+    return lambda: player.give_xp(13)
+
+
+@benchmark('build_skill_types', number=20)
+def _():
+    return lambda: rpg.builder.build_skill_types(SKILLS_PATH)
+
+
+@benchmark('build_skill_types.cached', number=20)
+def _():
+    cache_path = SPPath(rpg.config.SKILL_CACHE_PATH).with_name('bench_skills.json')
+    rpg.builder.build_skill_types(SKILLS_PATH, cache_path)  # Create the manifest
+    return lambda: rpg.builder.build_skill_types(SKILLS_PATH, cache_path)
+
+
+@benchmark('menu.upgrade_skills.build', number=5000)
+def _():
+    maxed_player(1)
+    return lambda: plugin.upgrade_skills_menu.build(1)
+
+
+@benchmark('menu.downgrade_skills.build', number=5000)
+def _():
+    maxed_player(1)
+    return lambda: plugin.downgrade_skills_menu.build(1)
+
+
+@benchmark('menu.skill_descriptions.build', number=5000)
+def _():
+    maxed_player(1)
+    return lambda: plugin.skill_descriptions_menu.build(1)
+
+
+@benchmark('menu.stats.build', number=5000)
+def _():
+    maxed_player(1)
+    return lambda: plugin.stats_menu.build(1)
+
+
+def synthetic_leaderboard(size: int) -> rpg.leaderboard.Leaderboard:
+    """Create a leaderboard of players spread over 200 levels."""
+    leaderboard = rpg.leaderboard.Leaderboard()
+    leaderboard.load((f'STEAM_{i}', None, i % 200, i * 7 % 1000) for i in range(size))
+    return leaderboard
+
+
+@benchmark('leaderboard.update.100k', number=50000)
+def _():
+    leaderboard = synthetic_leaderboard(100000)
+    xp = iter(range(10**9))
+    return lambda: leaderboard.update('STEAM_500', 100, next(xp) % 1000)
+
+
+@benchmark('leaderboard.rank.100k', number=50000)
+def _():
+    leaderboard = synthetic_leaderboard(100000)
+    return lambda: leaderboard.rank('STEAM_500')
+
+
+@benchmark('leaderboard.top_50.100k', number=5000)
+def _():
+    leaderboard = synthetic_leaderboard(100000)
+    return lambda: leaderboard.top(50)
+
+
+def synthetic_players(count: int) -> list:
+    """Create players spread over a 4096 units wide square."""
+    players = [rpg.player.Player(index) for index in range(1, count + 1)]
+    for player in players:
+        player.origin.x, player.origin.y = player.index * 977 % 4096, player.index * 631 % 4096
+    return players
+
+
+@benchmark('spatial.capture_and_within.64', number=5000)
+def _():
+    players = synthetic_players(64)
+    positions = rpg.spatial.SpatialIndex(lambda: players)
+    def capture_and_query():
+        positions.invalidate()
+        for player in players[:8]:
+            positions.within(player, 512, team=player.team, exclude=player)
+    return capture_and_query
+
+
+@benchmark('spatial.nearest_5.64', number=20000)
+def _():
+    players = synthetic_players(64)
+    positions = rpg.spatial.SpatialIndex(lambda: players)
+    return lambda: positions.nearest(players[0], 5, exclude=players[0])
+
+
+@benchmark('database.save_player', number=500)
+def _():
+    player = maxed_player(5)
+    return lambda: rpg.database.save_player(player)
+
+
+@benchmark('database.load_player', number=500)
+def _():
+    maxed_player(6)
+    player = plugin.new_player(6)
+    return lambda: rpg.database.load_player(player)
+
+
+# ========================
+#  Reporting
+# ========================
+
+def git_commit() -> Optional[str]:
+    """Get the current git commit of the repository, if any."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT_PATH, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(pattern: str='', repeat: int=5, scale: float=1.0) -> Dict[str, object]:
+    """Run every benchmark whose name contains `pattern`."""
+    results = {}
+    for name, setup in _benchmarks.items():
+        if pattern not in name:
+            continue
+        func = setup()
+        func()  # Warm up any lazy initialization
+        results[name] = measure(func, number=max(int(setup.number * scale), 1), repeat=repeat)
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(old: Dict[str, object], new: Dict[str, object]) -> str:
+    """Format a table comparing two runs's median timings."""
+    lines = [f"{'benchmark':<45} {'old us':>12} {'new us':>12} {'ratio':>8}"]
+    for name, result in new['results'].items():
+        new_time = result['median_us']
+        old_result = old['results'].get(name)
+        if old_result is None:
+            lines.append(f'{name:<45} {"-":>12} {new_time:>12.3f} {"-":>8}')
+        else:
+            old_time = old_result['median_us']
+            lines.append(f'{name:<45} {old_time:>12.3f} {new_time:>12.3f} {new_time / old_time:>8.2f}')
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', '--filter', default='', help='only run benchmarks containing this')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='timing repeats per benchmark')
+    parser.add_argument('-s', '--scale', type=float, default=1.0, help='multiplier for iteration counts')
+    parser.add_argument('-o', '--output', help='write the JSON results into a file')
+    parser.add_argument('-c', '--compare', help='compare against an earlier JSON results file')
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, args.repeat, args.scale)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    if args.compare:
+        with open(args.compare) as compare_file:
+            print(compare(json.load(compare_file), report), file=sys.stderr)
+    if not args.output:
+        print(output)
+    plugin.unload()
+
+
+if __name__ == '__main__':
+    main()
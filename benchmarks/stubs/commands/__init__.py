@@ -0,0 +1,19 @@
+"""Stand-in for `commands`."""
+import enum
+
+
+class CommandReturn(enum.IntEnum):
+    CONTINUE = 0
+    BLOCK = 1
+
+
+class _CommandDecorator:
+    registry = {}
+
+    def __init__(self, *names, **kwargs):
+        self.names = names
+
+    def __call__(self, callback):
+        for name in self.names:
+            self.registry.setdefault(name, []).append(callback)
+        return callback
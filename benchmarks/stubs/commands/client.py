@@ -0,0 +1,5 @@
+from commands import _CommandDecorator
+
+
+class ClientCommand(_CommandDecorator):
+    registry = {}
@@ -0,0 +1,5 @@
+from commands import _CommandDecorator
+
+
+class SayCommand(_CommandDecorator):
+    registry = {}
@@ -0,0 +1,5 @@
+from commands import _CommandDecorator
+
+
+class ServerCommand(_CommandDecorator):
+    registry = {}
@@ -0,0 +1,55 @@
+"""Stand-in for EasyPlayer's `easyplayer.Player`."""
+
+
+class Color:
+    def __init__(self, r=255, g=255, b=255, a=255):
+        self.r, self.g, self.b, self.a = r, g, b, a
+
+    def with_alpha(self, a):
+        return Color(self.r, self.g, self.b, a)
+
+
+class Vector:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+
+class _Effect:
+    running = True
+
+    def cancel(self):
+        self.running = False
+
+
+class Player:
+    """Player with plain attributes in place of entity properties."""
+
+    def __init__(self, index):
+        self.index = index
+        self.userid = index
+        self.steamid = f'STEAM_1:0:{index}'
+        self.name = f'Player {index}'
+        self.language = 'en'
+        self.team = 2 + index % 2
+        self.health = 100
+        self.max_health = 100
+        self.speed = 1.0
+        self.buttons = 0
+        self.color = Color()
+        self.origin = Vector(index * 64.0, 0.0, 0.0)
+        self.velocity = Vector(250.0, 0.0, 300.0)
+        self.base_velocity = Vector()
+        self.dead = False
+
+    def is_bot(self):
+        return self.steamid == 'BOT'
+
+    def freeze(self, duration):
+        return _Effect()
+
+    def shift_property(self, name, amount, duration):
+        setattr(self, name, getattr(self, name) + amount)
+        return _Effect()
@@ -0,0 +1,37 @@
+"""Stand-in for Source.Python's `events`.
+
+`@Event` callbacks are stored into the `registry`,
+and `fire()` calls them with a `GameEvent`.
+"""
+registry = {}
+
+
+class _Variables(dict):
+    def as_dict(self):
+        return dict(self)
+
+
+class GameEvent:
+    def __init__(self, name, /, **variables):
+        self.name = name
+        self.variables = _Variables(variables)
+
+    def __getitem__(self, key):
+        return self.variables[key]
+
+
+class Event:
+    def __init__(self, *event_names):
+        self.event_names = event_names
+
+    def __call__(self, callback):
+        for name in self.event_names:
+            registry.setdefault(name, []).append(callback)
+        return callback
+
+
+def fire(name, /, **variables):
+    event = GameEvent(name, **variables)
+    for callback in registry.get(name, ()):
+        callback(event)
+    return event
@@ -0,0 +1,40 @@
+"""Stand-in for Source.Python's `listeners`.
+
+Call `tick()` to notify every `OnTick` listener.
+"""
+
+
+class ListenerManager(list):
+    def register_listener(self, callback):
+        if callback not in self:
+            self.append(callback)
+
+    def unregister_listener(self, callback):
+        self.remove(callback)
+
+    def notify(self, *args, **kwargs):
+        for callback in tuple(self):
+            callback(*args, **kwargs)
+
+
+class ListenerManagerDecorator:
+    manager = None
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.manager.register_listener(callback)
+
+    def __call__(self, *args, **kwargs):
+        return self.callback(*args, **kwargs)
+
+
+class OnTick(ListenerManagerDecorator):
+    manager = ListenerManager()
+
+
+class OnLevelInit(ListenerManagerDecorator):
+    manager = ListenerManager()
+
+
+def tick():
+    OnTick.manager.notify()
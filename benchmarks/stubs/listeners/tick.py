@@ -0,0 +1,28 @@
+"""Stand-in for `listeners.tick`. Timers never fire on their own."""
+
+
+class Delay:
+    def __init__(self, delay, callback, args=(), kwargs=None, cancel_on_level_end=False):
+        self.delay = delay
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.running = True
+
+    def cancel(self):
+        self.running = False
+
+
+class Repeat:
+    def __init__(self, callback, args=(), kwargs=None, cancel_on_level_end=False):
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.running = False
+
+    def start(self, interval, limit=0, execute_on_start=False):
+        self.interval = interval
+        self.running = True
+
+    def stop(self):
+        self.running = False
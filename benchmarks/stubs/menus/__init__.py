@@ -0,0 +1,38 @@
+"""Stand-in for Source.Python's `menus`. Menus are built but never shown."""
+
+
+class _Option:
+    def __init__(self, text, value=None, highlight=True, selectable=True):
+        self.text = text
+        self.value = value
+        self.highlight = highlight
+        self.selectable = selectable
+
+
+PagedOption = ListOption = _Option
+
+
+class Text(_Option):
+    pass
+
+
+class _Menu(list):
+    def __init__(self, data=None, title=None, description=None, parent_menu=None,
+            build_callback=None, select_callback=None, items_per_page=None, **kwargs):
+        super().__init__(data or ())
+        self.title = title
+        self.description = description
+        self.parent_menu = parent_menu
+        self.build_callback = build_callback
+        self.select_callback = select_callback
+
+    def build(self, player_index):
+        if self.build_callback is not None:
+            self.build_callback(self, player_index)
+
+    def send(self, *player_indexes):
+        for index in player_indexes:
+            self.build(index)
+
+
+PagedMenu = ListMenu = _Menu
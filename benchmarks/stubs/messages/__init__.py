@@ -0,0 +1,11 @@
+"""Stand-in for Source.Python's `messages`."""
+
+
+class SayText2:
+    def __init__(self, message='', index=0, **tokens):
+        self.message = message
+        self.tokens = tokens
+
+    def send(self, *player_indexes, **tokens):
+        if hasattr(self.message, 'get_string'):
+            self.message.get_string(**tokens)
@@ -0,0 +1,19 @@
+"""Stand-in for the `path` package shipped with Source.Python."""
+import pathlib
+
+
+class Path(type(pathlib.Path())):
+    """`pathlib.Path` with the few `path.Path` methods the plugin uses."""
+
+    def dirs(self):
+        return sorted(path for path in self.iterdir() if path.is_dir() and path.name != '__pycache__')
+
+    def files(self, pattern='*'):
+        return sorted(path for path in self.glob(pattern) if path.is_file())
+
+    @property
+    def namebase(self):
+        return self.stem
+
+    def mtime(self):
+        return self.stat().st_mtime
@@ -0,0 +1,17 @@
+"""Stand-in for Source.Python's `paths` module.
+
+The plugin's data is stored into a temporary directory,
+unless the `RPG_BENCH_DATA_PATH` environment variable is set.
+"""
+import os
+import tempfile
+
+from path import Path
+
+
+_ROOT = Path(__file__).resolve().parent.parent.parent
+
+GAME_PATH = _ROOT
+PLUGIN_PATH = _ROOT / 'addons' / 'source-python' / 'plugins'
+TRANSLATION_PATH = _ROOT / 'resource' / 'source-python' / 'translations'
+PLUGIN_DATA_PATH = Path(os.environ.get('RPG_BENCH_DATA_PATH') or tempfile.mkdtemp(prefix='rpg-bench-'))
@@ -0,0 +1,7 @@
+import enum
+
+
+class PlayerButtons(enum.IntFlag):
+    ATTACK = 1 << 0
+    JUMP = 1 << 1
+    ATTACK2 = 1 << 11
@@ -0,0 +1,17 @@
+"""Stand-in for `players.dictionary`."""
+from players.helpers import index_from_userid
+
+
+class PlayerDictionary(dict):
+    def __init__(self, factory=None, *args, **kwargs):
+        super().__init__()
+        self._factory = factory
+        self._args = args
+        self._kwargs = kwargs
+
+    def __missing__(self, index):
+        value = self[index] = self._factory(index, *self._args, **self._kwargs)
+        return value
+
+    def from_userid(self, userid):
+        return self[index_from_userid(userid)]
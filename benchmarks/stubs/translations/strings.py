@@ -0,0 +1,36 @@
+"""Stand-in for `translations.strings`, parsing the same INI format."""
+from configparser import ConfigParser
+
+from path import Path
+from paths import TRANSLATION_PATH
+
+
+class TranslationStrings(dict):
+    def __init__(self):
+        super().__init__()
+        self.tokens = {}
+
+    def get_language(self, language=None):
+        if language in self:
+            return language
+        return 'en' if 'en' in self else next(iter(self), None)
+
+    def get_string(self, language=None, **tokens):
+        language = self.get_language(language)
+        if language is None:
+            return ''
+        return self[language].format(**{**self.tokens, **tokens})
+
+
+class LangStrings(dict):
+    def __init__(self, infile, encoding='utf-8'):
+        super().__init__()
+        path = Path(infile)
+        if not path.is_absolute():
+            path = TRANSLATION_PATH / path
+        parser = ConfigParser(interpolation=None)
+        parser.read(str(path) + '.ini', encoding=encoding)
+        for section in parser.sections():
+            strings = self[section] = TranslationStrings()
+            for language, text in parser.items(section):
+                strings[language] = text.strip().strip('"')
@@ -0,0 +1,16 @@
+"""Run the tests against the stand-in Source.Python modules of the benchmarks.
+
+The plugin's data (database, journal) goes into a temporary directory.
+"""
+# Python imports
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+sys.path[:0] = [
+    str(ROOT_PATH / 'benchmarks' / 'stubs'),
+    str(ROOT_PATH / 'addons' / 'source-python' / 'plugins'),
+]
+os.environ.setdefault('RPG_BENCH_DATA_PATH', tempfile.mkdtemp(prefix='rpg-test-'))
@@ -0,0 +1,83 @@
+# Python imports
+from sqlalchemy.sql import and_
+
+# RPG imports
+import rpg.database
+from rpg.journal import Journal
+from rpg.player import Player
+from rpg.skill import Skill, SkillType
+from rpg.tables import player_table, skill_table
+
+
+def new_player(index: int) -> Player:
+    player = Player(index)
+    player.add_skill(Skill(SkillType('alpha')))
+    return player
+
+
+def total_xp(player: Player) -> int:
+    return sum(100 + 20 * level for level in range(player.level)) + player.xp
+
+
+def test_read_keeps_the_bases_in_order(tmp_path):
+    journal = Journal(tmp_path)
+    journal.record_player('a', 1, 10, 5, (0, 0, 0))
+    journal.record_player('a', 1, 20, 5, (0, 0, 0))
+    journal.record_player('a', 2, 0, 10, (1, 20, 5))
+    journal.record_skill('a', 'alpha', 1, 0)
+    journal.record_skill('a', 'alpha', 2, 1)
+    journal.close()
+
+    players, skills = Journal(tmp_path).read()
+    assert players == {'a': ((2, 0, 10), [(0, 0, 0), (1, 20, 5)])}
+    assert skills == {('a', 'alpha'): (2, [0, 1])}
+
+
+def test_replay_merges_with_changes_made_after_the_crash(tmp_path):
+    player = new_player(201)
+    rpg.database.create_player(player)
+    player.journal = Journal(tmp_path)
+    player.give_xp(250)
+    player.upgrade_skill(player.get_skill('alpha'))
+    player.journal.close()
+
+    # Another server changes the player before this one restarts
+    with rpg.database.engine.begin() as conn:
+        conn.execute(player_table.update().where(player_table.c.id==player._db_id).values(
+            xp=player_table.c.xp + 50,
+            credits=player_table.c.credits + 7,
+            version=player_table.c.version + 1,
+        ))
+        conn.execute(skill_table.update().where(and_(
+            skill_table.c.player_id==player._db_id,
+            skill_table.c.skill_id==player.get_skill('alpha')._db_id,
+        )).values(level=skill_table.c.level + 2))
+
+    rpg.database.apply_journal(*Journal(tmp_path).read())
+
+    replayed = new_player(201)
+    assert rpg.database.load_player(replayed)
+    assert total_xp(replayed) == total_xp(player) + 50
+    assert replayed.credits == player.credits + 7
+    assert replayed.get_skill('alpha').level == player.get_skill('alpha').level + 2
+
+
+def test_replay_of_already_saved_changes_is_idempotent(tmp_path):
+    player = new_player(202)
+    rpg.database.create_player(player)
+    player.journal = Journal(tmp_path)
+    player.give_xp(250)
+    player.upgrade_skill(player.get_skill('alpha'))
+    rpg.database.save_player(player)
+    player.give_xp(400)
+    player.upgrade_skill(player.get_skill('alpha'))
+    player.journal.close()
+
+    # Both segments are replayed, although the first one had been saved
+    rpg.database.apply_journal(*Journal(tmp_path).read())
+    rpg.database.apply_journal(*Journal(tmp_path).read())
+
+    replayed = new_player(202)
+    assert rpg.database.load_player(replayed)
+    assert (replayed.level, replayed.xp, replayed.credits) == (player.level, player.xp, player.credits)
+    assert replayed.get_skill('alpha').level == player.get_skill('alpha').level
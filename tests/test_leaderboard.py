@@ -0,0 +1,44 @@
+# Python imports
+import random
+
+# RPG imports
+from rpg.leaderboard import Leaderboard
+
+
+def ranking(players):
+    return sorted(players, key=lambda steamid: (-players[steamid][0], -players[steamid][1], steamid))
+
+
+def test_updates_keep_ranks_and_pages_in_order():
+    rng = random.Random(5)
+    players = {f'STEAM_{i}': (rng.randrange(50), rng.randrange(1000)) for i in range(3000)}
+    leaderboard = Leaderboard()
+    leaderboard.load((steamid, None, level, xp) for steamid, (level, xp) in players.items())
+    for _ in range(5000):
+        steamid = f'STEAM_{rng.randrange(4000)}'
+        if rng.random() < 0.1:
+            players.pop(steamid, None)
+            leaderboard.remove(steamid)
+        else:
+            players[steamid] = (rng.randrange(50), rng.randrange(1000))
+            leaderboard.update(steamid, *players[steamid])
+    expected = ranking(players)
+    assert len(leaderboard) == len(expected)
+    for steamid in expected[::97]:
+        assert leaderboard.rank(steamid) == expected.index(steamid) + 1
+    assert [entry.steamid for entry in leaderboard.page(0, len(expected))] == expected
+    assert [entry.steamid for entry in leaderboard.page(1500, 700)] == expected[1500:2200]
+    assert [entry.rank for entry in leaderboard.page(1500, 3)] == [1501, 1502, 1503]
+    assert leaderboard.page(len(expected), 10) == []
+
+
+def test_removing_every_player_empties_the_leaderboard():
+    leaderboard = Leaderboard()
+    for i in range(2000):
+        leaderboard.update(f'STEAM_{i}', i % 7, i)
+    for i in range(2000):
+        leaderboard.remove(f'STEAM_{i}')
+    assert len(leaderboard) == 0
+    assert leaderboard.top(5) == []
+    leaderboard.update('STEAM_X', 1, 1)
+    assert leaderboard.rank('STEAM_X') == 1
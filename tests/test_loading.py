@@ -0,0 +1,52 @@
+# Python imports
+from threading import Event
+
+# RPG imports
+from rpg.loading import PlayerLoader
+from rpg.player import Player
+
+
+def test_discard_during_failing_load_drops_the_load():
+    started, release = Event(), Event()
+    calls, loaded = [], []
+
+    def fetch(steamid, skill_keys):
+        calls.append(steamid)
+        started.set()
+        release.wait(5)
+        raise RuntimeError('Database is down')
+
+    loader = PlayerLoader(fetch, lambda player, data: loaded.append(player), retry_delay=0.0, clock=lambda: 0.0)
+    player = Player(1)
+    loader.submit(player)
+    assert started.wait(5)
+    loader.discard(player)
+    release.set()
+    loader._executor.shutdown(wait=True)
+
+    loader.process_loaded()
+    assert loader._retries == {}
+    assert calls == [player.steamid]
+    assert loaded == []
+
+
+def test_failing_load_of_replaced_player_is_not_retried():
+    release = Event()
+    loaded = []
+
+    def failing_fetch(steamid, skill_keys):
+        release.wait(5)
+        raise RuntimeError('Database is down')
+
+    loader = PlayerLoader(lambda steamid, skill_keys: steamid, lambda player, data: loaded.append(player),
+        retry_delay=0.0, clock=lambda: 0.0)
+    old_player = Player(1)
+    loader.submit(old_player, failing_fetch)
+    new_player = Player(1)
+    loader.submit(new_player)
+    release.set()
+    loader._executor.shutdown(wait=True)
+
+    loader.process_loaded()
+    assert loaded == [new_player]
+    assert loader._retries == {}
@@ -0,0 +1,69 @@
+# Python imports
+from typing import List
+
+# RPG imports
+from rpg.journal import Journal
+from rpg.persistence import PlayerSnapshot, SaveQueue
+
+
+def snapshot(steamid: str, level: int) -> PlayerSnapshot:
+    return PlayerSnapshot(steamid, 1, steamid, level, 0, 0, (0, 0, 0), {})
+
+
+def failing_save(bad: str, saved: List[str]):
+    def save(snapshots: List[PlayerSnapshot]) -> None:
+        if any(snapshot.steamid == bad for snapshot in snapshots):
+            raise RuntimeError(f"Player '{bad}' can't be saved")
+        saved.extend(snapshot.steamid for snapshot in snapshots)
+    return save
+
+
+def test_parked_snapshot_keeps_its_journal_segment(tmp_path):
+    journal = Journal(tmp_path)
+    saved = []
+    queue = SaveQueue(failing_save('bad', saved), retry_delay=0.0, max_attempts=2)
+
+    journal.record_player('good', 1, 0, 0, (0, 0, 0))
+    journal.record_player('bad', 1, 0, 0, (0, 0, 0))
+    kept = journal.rotate()
+    queue.put_snapshot(snapshot('good', 1))
+    queue.put_snapshot(snapshot('bad', 1))
+    queue.put_all([], on_saved=lambda: journal.discard(kept))
+    queue.start()
+    assert queue.flush(5)
+    assert [parked.steamid for parked in queue.parked] == ['bad']
+
+    journal.record_player('good', 2, 0, 0, (0, 0, 0))
+    discarded = journal.rotate()
+    queue.put_snapshot(snapshot('good', 2))
+    queue.put_all([], on_saved=lambda: journal.discard(discarded))
+    assert queue.flush(5)
+
+    assert not queue.stop(5)
+    journal.close()
+    assert saved.count('good') == 2
+    assert journal.segments() == kept
+
+
+def test_held_segment_is_discarded_once_parked_player_is_saved(tmp_path):
+    journal = Journal(tmp_path)
+    saved = []
+    queue = SaveQueue(failing_save('bad', saved), retry_delay=0.0, max_attempts=2)
+
+    journal.record_player('bad', 1, 0, 0, (0, 0, 0))
+    segments = journal.rotate()
+    queue.put_snapshot(snapshot('good', 1))
+    queue.put_snapshot(snapshot('bad', 1))
+    queue.put_all([], on_saved=lambda: journal.discard(segments))
+    queue.start()
+    assert queue.flush(5)
+    assert journal.segments() == segments
+
+    queue._save = failing_save('nobody', saved)
+    queue.put_snapshot(snapshot('bad', 2))
+    assert queue.flush(5)
+
+    assert queue.stop(5)
+    journal.close()
+    assert 'bad' in saved
+    assert journal.segments() == []
@@ -0,0 +1,64 @@
+# Site-Package imports
+from sqlalchemy import event
+
+# RPG imports
+import rpg.database
+from rpg.persistence import copy_player_data
+from rpg.player import Player
+from rpg.skill import Skill, SkillType
+from rpg.tables import player_table
+
+
+def new_player(index: int) -> Player:
+    player = Player(index)
+    player.add_skill(Skill(SkillType('alpha')))
+    if not rpg.database.load_player(player):
+        rpg.database.create_player(player)
+    return player
+
+
+def test_is_current_does_not_query_the_database():
+    data = copy_player_data(new_player(301))
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(rpg.database.engine.engine, 'before_cursor_execute', listener)
+    try:
+        assert rpg.database.is_current(data)
+    finally:
+        event.remove(rpg.database.engine.engine, 'before_cursor_execute', listener)
+    assert statements == []
+
+
+def test_merged_save_is_reset_by_the_next_clean_save():
+    player = new_player(302)
+
+    # Another server saves the player in the meantime
+    with rpg.database.engine.begin() as conn:
+        conn.execute(player_table.update().where(player_table.c.id==player._db_id).values(
+            version=player_table.c.version + 1,
+        ))
+    player.give_xp(10)
+    rpg.database.save_player(player)
+    assert not rpg.database.is_current(copy_player_data(player))
+
+    player.give_xp(10)
+    rpg.database.save_player(player)
+    assert rpg.database.is_current(copy_player_data(player))
+
+
+def test_diverged_player_stays_stale_until_loaded():
+    player = new_player(303)
+    with rpg.database.engine.begin() as conn:
+        conn.execute(player_table.update().where(player_table.c.id==player._db_id).values(
+            xp=player_table.c.xp + 50,
+            version=player_table.c.version + 1,
+        ))
+    player.give_xp(10)
+    rpg.database.save_player(player)
+    player.give_xp(10)
+    rpg.database.save_player(player)
+    assert not rpg.database.is_current(copy_player_data(player))
+
+    player = new_player(303)
+    assert player.xp == 70
+    assert rpg.database.is_current(copy_player_data(player))
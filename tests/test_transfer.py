@@ -0,0 +1,66 @@
+# Python imports
+import json
+
+# Site-Package imports
+import pytest
+from sqlalchemy import create_engine
+
+# RPG imports
+from rpg.tables import (
+    legacy_metadata, legacy_player_table, legacy_skill_index, legacy_skill_table,
+    metadata, player_table, skill_key_table, skill_table, upgrade_schema,
+)
+from rpg.transfer import export_players
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as export_file:
+        return [json.loads(line) for line in export_file]
+
+
+def test_export_skips_skills_of_missing_players(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rpg.db'}")
+    metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(skill_key_table.insert(), [{'id': 1, 'key': 'health'}])
+        conn.execute(player_table.insert(), [
+            {'id': 1, 'steamid': 'STEAM_1', 'name': 'a', 'level': 1, 'xp': 0, 'credits': 0},
+            {'id': 3, 'steamid': 'STEAM_3', 'name': 'c', 'level': 3, 'xp': 0, 'credits': 0},
+        ])
+        conn.execute(skill_table.insert(), [
+            {'player_id': 1, 'skill_id': 1, 'level': 1},
+            {'player_id': 2, 'skill_id': 1, 'level': 2},  # Player 2 was deleted
+            {'player_id': 3, 'skill_id': 1, 'level': 3},
+        ])
+
+    assert export_players(engine, str(tmp_path / 'players.jsonl')) == 2
+    assert [record['skills'] for record in read_lines(tmp_path / 'players.jsonl')] == [{'health': 1}, {'health': 3}]
+
+
+def test_legacy_export_skips_skills_of_missing_players(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rpg.db'}")
+    legacy_metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(legacy_player_table.insert(), [
+            {'steamid': 'STEAM_1', 'level': 1, 'xp': 0, 'credits': 0},
+            {'steamid': 'STEAM_3', 'level': 3, 'xp': 0, 'credits': 0},
+        ])
+        conn.execute(legacy_skill_table.insert(), [
+            {'steamid': 'STEAM_1', 'key': 'health', 'level': 1},
+            {'steamid': 'STEAM_2', 'key': 'health', 'level': 2},
+            {'steamid': 'STEAM_3', 'key': 'health', 'level': 3},
+        ])
+
+    assert export_players(engine, str(tmp_path / 'players.jsonl'), legacy=True) == 2
+    assert [record['skills'] for record in read_lines(tmp_path / 'players.jsonl')] == [{'health': 1}, {'health': 3}]
+
+
+def test_legacy_export_requires_the_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rpg.db'}")
+    legacy_metadata.create_all(bind=engine)
+    legacy_skill_index.drop(bind=engine)
+
+    with pytest.raises(ValueError, match='index-legacy'):
+        export_players(engine, str(tmp_path / 'players.jsonl'), legacy=True)
+    assert not (tmp_path / 'players.jsonl').exists()